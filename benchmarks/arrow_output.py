@@ -0,0 +1,97 @@
+"""
+Size and latency of a 100k row query result written as JSON, NDJSON and an
+Arrow IPC stream, and the time a client takes to decode each of them
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+import common  # noqa: F401
+import orjson
+import pyarrow as pa
+from lib.responses import MongoJSONResponse
+from lib.streaming import arrow, ndjson
+
+ROWS = 100_000
+
+
+def result_rows() -> list:
+    random.seed(0)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "time": start + timedelta(minutes=index),
+            "region": random.choice(["north", "south", "east", "west"]),
+            "orders": random.randint(0, 500),
+            "revenue": round(random.uniform(0, 10_000), 2),
+        }
+        for index in range(ROWS)
+    ]
+
+
+async def generate(rows):
+    for row in rows:
+        yield row
+
+
+async def written(body) -> tuple:
+    """
+    Drains a response body, returning its bytes, the time it took and the
+    time its first chunk took
+    """
+    start = time.perf_counter()
+    first_chunk = None
+    chunks = []
+    async for chunk in await body():
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+        chunks.append(chunk)
+    return b"".join(chunks), time.perf_counter() - start, first_chunk
+
+
+async def main():
+    rows = result_rows()
+
+    async def json():
+        # the whole body is rendered before it is sent
+        yield MongoJSONResponse({"rows": rows}).body
+
+    async def json_body():
+        return json()
+
+    async def ndjson_body():
+        return ndjson(generate(rows))
+
+    outputs = {
+        "json": await written(json_body),
+        "ndjson": await written(ndjson_body),
+        "arrow": await written(lambda: arrow(generate(rows))),
+    }
+    decoders = {
+        "json": orjson.loads,
+        "ndjson": lambda body: [orjson.loads(line) for line in body.splitlines()],
+        "arrow": lambda body: pa.ipc.open_stream(body).read_all(),
+    }
+
+    print(f"{ROWS} rows")
+    header = ["format", "bytes", "write ms", "first byte ms", "decode ms"]
+    table = []
+    for name, (body, total, first_chunk) in outputs.items():
+        start = time.perf_counter()
+        decoders[name](body)
+        decode = time.perf_counter() - start
+        table.append(
+            [
+                name,
+                f"{len(body):,}",
+                f"{total * 1000:.0f}",
+                f"{first_chunk * 1000:.1f}",
+                f"{decode * 1000:.0f}",
+            ]
+        )
+    common.print_table(header, table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Shared setup of the benchmarks, run them from the repository root, e.g.
+
+    python benchmarks/arrow_output.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# the settings are read when the modules are imported
+for key, value in {
+    "APP_HOST": "127.0.0.1",
+    "APP_PORT": "8000",
+    "DB_USER": "bench",
+    "DB_PASSWORD": "bench",
+    "DB_HOST": "localhost",
+    "DB_NAME": "bench",
+    "API_KEY": "bench",
+    "PRIVATE_KEY": "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=",
+}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def best_of(repeat: int, function, *args):
+    """
+    Runs the function `repeat` times, returning its fastest time and the
+    result of its last run
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def print_table(header: list, rows: list):
+    widths = [
+        max(len(str(row[index])) for row in [header, *rows])
+        for index in range(len(header))
+    ]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
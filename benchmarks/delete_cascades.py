@@ -0,0 +1,182 @@
+"""
+Round trips and time of the delete cascades, counted with a Mongo command
+listener, against the per-row loops they replaced. Transactions need a
+replica set:
+
+    MONGODB_BENCH_URI="mongodb://localhost:27017/?replicaSet=rs0" \\
+        python benchmarks/delete_cascades.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+import common
+from beanie import PydanticObjectId as ObjectId
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from configs.database import mongodb
+from models.connection import Connection, ConnectionType
+from models.dashboard import Dashboard, PublishedDashboard
+from models.folder import Folder
+from models.query import Query
+from repositories.registry import RepositoryRegistry
+from repositories.session import current_session
+from services.connection import ConnectionService
+from services.folder import FolderService
+
+SIZES = [10, 100, 500]
+USER_ID = "bench"
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def folder_cascade_before(registry: RepositoryRegistry, folder_id: ObjectId):
+    """
+    The loop the cascade replaced, fetching and updating each dashboard
+    """
+    await registry.folder.get_by_id(folder_id)
+
+    async def transaction(registry: RepositoryRegistry):
+        session = current_session.get()
+        dashboards = Dashboard.get_motor_collection()
+        found = await dashboards.find(
+            {"folder_id": folder_id}, {"_id": 1}, session=session
+        ).to_list(None)
+        for dashboard in found:
+            await dashboards.find_one({"_id": dashboard["_id"]}, session=session)
+            await dashboards.update_one(
+                {"_id": dashboard["_id"]}, {"$set": {"folder_id": None}}, session=session
+            )
+        await registry.folder.delete(folder_id)
+
+    await registry.transaction(transaction)
+
+
+async def connection_cascade_before(
+    registry: RepositoryRegistry, connection_id: ObjectId
+):
+    """
+    The loop the cascade replaced, fetching and deleting each query
+    """
+    await registry.connection.get_by_id(connection_id)
+
+    async def transaction(registry: RepositoryRegistry):
+        session = current_session.get()
+        queries = Query.get_motor_collection()
+        found = await queries.find(
+            {"connection_id": connection_id}, {"_id": 1}, session=session
+        ).to_list(None)
+        for query in found:
+            await queries.find_one({"_id": query["_id"]}, session=session)
+            await queries.delete_one({"_id": query["_id"]}, session=session)
+        await registry.connection.delete(connection_id)
+
+    await registry.transaction(transaction)
+
+
+async def folder_cascade_after(registry: RepositoryRegistry, folder_id: ObjectId):
+    await FolderService(registry).delete_folder(folder_id, USER_ID)
+
+
+async def connection_cascade_after(registry: RepositoryRegistry, connection_id: ObjectId):
+    await ConnectionService(registry).delete_connection(connection_id, USER_ID)
+
+
+async def folder_with_dashboards(size: int) -> ObjectId:
+    folder = await Folder(name="folder", user_id=USER_ID).insert()
+    await Dashboard.get_motor_collection().insert_many(
+        [
+            {"name": f"dashboard {index}", "user_id": USER_ID, "folder_id": folder.id}
+            for index in range(size)
+        ]
+    )
+    return folder.id
+
+
+async def connection_with_queries(size: int) -> ObjectId:
+    connection = await Connection(
+        name="connection", user_id=USER_ID, type=ConnectionType.REST
+    ).insert()
+    await Query.get_motor_collection().insert_many(
+        [
+            {
+                "name": f"query {index}",
+                "user_id": USER_ID,
+                "connection_id": connection.id,
+                "metadata": {},
+            }
+            for index in range(size)
+        ]
+    )
+    return connection.id
+
+
+async def measured(counter: CommandCounter, cascade, registry, document_id) -> tuple:
+    commands = counter.count
+    start = time.perf_counter()
+    await cascade(registry, document_id)
+    return counter.count - commands, time.perf_counter() - start
+
+
+async def main():
+    uri = os.environ.get("MONGODB_BENCH_URI")
+    if not uri:
+        sys.exit("Set MONGODB_BENCH_URI to a replica set, see the docstring")
+    counter = CommandCounter()
+    mongodb.client = AsyncIOMotorClient(uri, event_listeners=[counter])
+    mongodb.database = mongodb.client[f"dashboards_bench_{uuid.uuid4().hex[:8]}"]
+    await init_beanie(
+        mongodb.database,
+        document_models=[Dashboard, PublishedDashboard, Folder, Connection, Query],
+    )
+    registry = RepositoryRegistry(mongodb)
+    cascades = {
+        "folder": (folder_with_dashboards, folder_cascade_before, folder_cascade_after),
+        "connection": (
+            connection_with_queries,
+            connection_cascade_before,
+            connection_cascade_after,
+        ),
+    }
+    table = []
+    try:
+        for name, (seed, before, after) in cascades.items():
+            for size in SIZES:
+                old = await measured(counter, before, registry, await seed(size))
+                new = await measured(counter, after, registry, await seed(size))
+                table.append(
+                    [
+                        name,
+                        size,
+                        old[0],
+                        new[0],
+                        f"{old[1] * 1000:.0f}",
+                        f"{new[1] * 1000:.0f}",
+                    ]
+                )
+    finally:
+        await mongodb.client.drop_database(mongodb.database.name)
+        mongodb.client.close()
+    common.print_table(
+        ["cascade", "rows", "commands before", "commands after", "ms before", "ms after"],
+        table,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
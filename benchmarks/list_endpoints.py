@@ -0,0 +1,131 @@
+"""
+Requests/sec of a 1k dashboard list page served from projected dicts with
+orjson, against Beanie documents validated by the response model. Reads
+from MONGODB_BENCH_URI when set, from mongomock otherwise:
+
+    python benchmarks/list_endpoints.py
+"""
+
+import asyncio
+import os
+import time
+import uuid
+import common
+import httpx
+from beanie import init_beanie
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pymongo import ASCENDING
+from lib.pagination import paginate
+from lib.responses import MongoJSONResponse
+from main import app
+from models.connection import Connection
+from models.dashboard import Dashboard, PublishedDashboard
+from models.folder import Folder
+from models.query import Query
+from schemas.dashboard import DashboardPartialResponse
+from schemas.pagination import Page
+
+ROWS = 1000
+SECONDS = 5
+USER_ID = "bench"
+
+before = FastAPI()
+
+
+@before.get(
+    "/v1/dashboards/",
+    response_model=Page[DashboardPartialResponse],
+    response_model_exclude_unset=True,
+)
+async def list_dashboards_before(user_id: str, limit: int):
+    """
+    The list route before the fast path, hydrating Beanie documents that
+    FastAPI validates against the response model and writes with json
+    """
+    dashboards = (
+        await Dashboard.find({"user_id": user_id})
+        .sort([("_id", ASCENDING)])
+        .limit(limit + 1)
+        .to_list()
+    )
+    page = paginate([{"_id": dashboard.id} for dashboard in dashboards], limit)
+    return {"items": dashboards[:limit], "next_cursor": page.next_cursor}
+
+
+def render_before(rows: list) -> bytes:
+    documents = [Dashboard.model_validate(row) for row in rows]
+    page = Page[DashboardPartialResponse].model_validate({"items": documents})
+    content = page.model_dump(mode="json", by_alias=True, exclude_unset=True)
+    return JSONResponse(content).body
+
+
+def render_after(rows: list) -> bytes:
+    return MongoJSONResponse(paginate(rows, len(rows))).body
+
+
+async def database():
+    uri = os.environ.get("MONGODB_BENCH_URI")
+    if uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        return AsyncIOMotorClient(uri)[f"dashboards_bench_{uuid.uuid4().hex[:8]}"]
+    from mongomock_motor import AsyncMongoMockClient
+
+    return AsyncMongoMockClient()["bench"]
+
+
+async def requests_per_second(served: FastAPI) -> tuple:
+    transport = httpx.ASGITransport(app=served)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        params = {"user_id": USER_ID, "limit": ROWS}
+        body = (await client.get("/v1/dashboards/", params=params)).json()
+        requests = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < SECONDS:
+            response = await client.get("/v1/dashboards/", params=params)
+            response.raise_for_status()
+            requests += 1
+        return requests / (time.perf_counter() - start), body
+
+
+async def main():
+    db = await database()
+    await init_beanie(
+        db, document_models=[Dashboard, PublishedDashboard, Folder, Connection, Query]
+    )
+    widgets = [
+        {"type": "line", "query_id": str(uuid.uuid4()), "x": index} for index in range(5)
+    ]
+    await Dashboard.insert_many(
+        [
+            Dashboard(
+                user_id=USER_ID, name=f"dashboard {index}", metadata={"widgets": widgets}
+            )
+            for index in range(ROWS)
+        ]
+    )
+    try:
+        old, old_body = await requests_per_second(before)
+        new, new_body = await requests_per_second(app)
+        rows = await Dashboard.get_motor_collection().find({}).to_list(None)
+    finally:
+        if os.environ.get("MONGODB_BENCH_URI"):
+            await db.client.drop_database(db.name)
+    assert old_body == new_body, "the two paths must return the same JSON"
+    source = "MongoDB" if os.environ.get("MONGODB_BENCH_URI") else "mongomock"
+    print(f"{ROWS} dashboards per page read from {source}")
+    # the page built from rows already read, without the database or http
+    old_render, _ = common.best_of(20, render_before, rows)
+    new_render, _ = common.best_of(20, render_after, rows)
+    common.print_table(
+        ["path", "requests/sec", "render ms"],
+        [
+            ["beanie + response model", f"{old:.1f}", f"{old_render * 1000:.1f}"],
+            ["dicts + orjson", f"{new:.1f}", f"{new_render * 1000:.1f}"],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Payload size and time of a 1M point time series sent as it is, against
+the same series downsampled with LTTB and aggregated in hourly buckets by
+the in-memory transforms REST sources use. Decoding the JSON stands in for
+the client side work before rendering
+"""
+
+import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta
+import common  # noqa: F401
+import orjson
+from configs.settings import settings
+from executors.transform import aggregated, downsampled
+from lib.responses import MongoJSONResponse
+from schemas.query import Transform
+
+ROWS = 1_000_000
+TRANSFORMS = {
+    "lttb 1000 points": Transform(time_column="time", y="value", points=1000),
+    "hourly avg": Transform(
+        time_column="time",
+        interval=3600,
+        aggregations=[{"function": "avg", "column": "value"}],
+    ),
+}
+
+
+def series() -> list:
+    random.seed(0)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "time": start + timedelta(seconds=index),
+            "value": math.sin(index / 5000) * 100 + random.gauss(0, 5),
+        }
+        for index in range(ROWS)
+    ]
+
+
+async def generate(rows):
+    for row in rows:
+        yield row
+
+
+async def measured(rows: list, transform=None) -> list:
+    start = time.perf_counter()
+    if transform is None:
+        result = rows
+    elif transform.points:
+        result = [row async for row in downsampled(generate(rows), transform)]
+    else:
+        result = [row async for row in aggregated(generate(rows), transform)]
+    computed = time.perf_counter() - start
+    start = time.perf_counter()
+    body = MongoJSONResponse({"rows": result}).body
+    written = time.perf_counter() - start
+    start = time.perf_counter()
+    orjson.loads(body)
+    decoded = time.perf_counter() - start
+    return [
+        len(result),
+        f"{len(body):,}",
+        f"{computed * 1000:.0f}",
+        f"{written * 1000:.0f}",
+        f"{decoded * 1000:.0f}",
+    ]
+
+
+async def main():
+    # in-memory aggregations are capped, lifted to transform the same series
+    settings.EXECUTOR_MAX_ROWS = ROWS
+    rows = series()
+    table = [["raw", *await measured(rows)]]
+    for name, transform in TRANSFORMS.items():
+        table.append([name, *await measured(rows, transform)])
+    print(f"{ROWS} rows")
+    common.print_table(
+        ["output", "rows", "bytes", "transform ms", "write ms", "decode ms"], table
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,12 +1,19 @@
+import asyncio
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 from configs.settings import settings
+from lib.metrics import CommandMetrics
+from lib.log import logger
+from lib.pool import pool_metrics
 from models.dashboard import Dashboard, PublishedDashboard
 from models.folder import Folder
 from models.connection import Connection
 from models.query import Query
+from repositories.pipelines import collection_name, match, paginate
+from schemas.pagination import DEFAULT_PAGE_SIZE
 from contextlib import asynccontextmanager
 from enum import Enum
+from typing import Set
 
 
 class Operators(str, Enum):
@@ -20,6 +27,33 @@ class Operators(str, Enum):
     EM = "$elemMatch"
 
 
+# Filters the services build for the list endpoints, explained at startup
+LIST_FILTERS = {
+    Dashboard: [["user_id"], ["user_id", "folder_id"], ["user_id", "name"]],
+    Folder: [["user_id"], ["user_id", "name"]],
+    Connection: [["user_id"], ["user_id", "type"], ["user_id", "name"]],
+    Query: [["user_id"], ["user_id", "connection_id"], ["connection_id"]],
+}
+
+
+# a collection scan or a sort in memory, instead of walking an index in order
+SLOW_STAGES = {"COLLSCAN", "SORT"}
+
+
+def plan_stages(plan) -> Set[str]:
+    """
+    Stages of the winning plans in an explain output
+    """
+    if isinstance(plan, list):
+        return set().union(*(plan_stages(item) for item in plan))
+    if not isinstance(plan, dict):
+        return set()
+    stages = {plan["stage"]} if isinstance(plan.get("stage"), str) else set()
+    return stages.union(
+        *(plan_stages(value) for key, value in plan.items() if key != "rejectedPlans")
+    )
+
+
 class MongoDB:
     def __init__(self):
         self.client = None
@@ -33,12 +67,81 @@ class MongoDB:
 
         DATABASE_URL = f"{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-        self.client = AsyncIOMotorClient(DATABASE_URL)
+        self.client = AsyncIOMotorClient(DATABASE_URL, **self.client_options())
         self.database = self.client[DB_NAME]
+        await self.warm_up()
         await init_beanie(
             self.database,
             document_models=[Dashboard, PublishedDashboard, Folder, Connection, Query],
         )
+        if settings.DB_CHECK_INDEXES:
+            await self.check_indexes()
+
+    def client_options(self) -> dict:
+        options = {
+            "maxPoolSize": settings.DB_MAX_POOL_SIZE,
+            "minPoolSize": settings.DB_MIN_POOL_SIZE,
+            "serverSelectionTimeoutMS": settings.DB_SERVER_SELECTION_TIMEOUT_MS,
+            "readPreference": settings.DB_READ_PREFERENCE,
+            "event_listeners": [pool_metrics, CommandMetrics()],
+        }
+        if settings.DB_MAX_IDLE_TIME_MS is not None:
+            options["maxIdleTimeMS"] = settings.DB_MAX_IDLE_TIME_MS
+        if settings.DB_WAIT_QUEUE_TIMEOUT_MS is not None:
+            options["waitQueueTimeoutMS"] = settings.DB_WAIT_QUEUE_TIMEOUT_MS
+        if settings.DB_COMPRESSORS:
+            options["compressors"] = settings.DB_COMPRESSORS
+        return options
+
+    async def warm_up(self):
+        """
+        Opens the minimum pool size up front with concurrent pings, so the
+        first requests after a deploy do not pay for the connection setup
+        """
+        if not settings.DB_MIN_POOL_SIZE:
+            return
+        try:
+            await asyncio.gather(
+                *(self.database.command("ping") for _ in range(settings.DB_MIN_POOL_SIZE))
+            )
+        except Exception as e:
+            logger.warning("Could not warm up the connection pool: %s", e)
+
+    async def check_indexes(self):
+        """
+        Warns about list queries that would fall back to a collection scan or
+        sort their documents in memory
+        """
+        for model, filter_sets in LIST_FILTERS.items():
+            collection = collection_name(model)
+            for fields in filter_sets:
+                filters = [
+                    {"name": field, "value": None, "operator": Operators.EQ}
+                    for field in fields
+                ]
+                pipeline = [match(filters), *paginate(DEFAULT_PAGE_SIZE)]
+                try:
+                    plan = await self.database.command(
+                        {
+                            "explain": {
+                                "aggregate": collection,
+                                "pipeline": pipeline,
+                                "cursor": {},
+                            },
+                            "verbosity": "queryPlanner",
+                        }
+                    )
+                except Exception as e:
+                    logger.warning("Could not explain %s query: %s", collection, e)
+                    continue
+                slow_stages = plan_stages(plan) & SLOW_STAGES
+                if slow_stages:
+                    logger.warning(
+                        "Listing %s by %s is not served by an index (%s)",
+                        collection,
+                        ", ".join(fields),
+                        ", ".join(sorted(slow_stages)),
+                    )
 
     async def disconnect(self):
         self.client.close()
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -8,8 +9,45 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_HOST: str
     DB_NAME: str
+    DB_CHECK_INDEXES: bool = True
+    DB_MAX_POOL_SIZE: int = 100
+    # connections opened at startup and kept open, none by default
+    DB_MIN_POOL_SIZE: int = 0
+    DB_MAX_IDLE_TIME_MS: Optional[int] = None
+    DB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    DB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # comma separated, zstd and snappy need their python packages installed
+    DB_COMPRESSORS: Optional[str] = None
+    DB_READ_PREFERENCE: str = "primary"
+    # published and list reads go to secondaries lagging at most this much,
+    # the server does not accept less than 90 seconds. Off by default: a read
+    # right after a write may not see it, and may be cached until the TTL
+    DB_SECONDARY_READS: bool = False
+    DB_MAX_STALENESS_SECONDS: int = 90
     API_KEY: str
     PRIVATE_KEY: str
+    PUBLISHED_CACHE_MAX_SIZE: int = 1024
+    PUBLISHED_CACHE_TTL: int = 60
+    REPOSITORY_CACHE_MAX_SIZE: int = 1024
+    REPOSITORY_CACHE_TTL: int = 300
+    CACHE_WATCH_RETRY_SECONDS: int = 5
+    EXECUTOR_POOL_SIZE: int = 10
+    EXECUTOR_IDLE_SECONDS: int = 300
+    EXECUTOR_TIMEOUT_SECONDS: float = 30
+    EXECUTOR_BATCH_SIZE: int = 1000
+    EXECUTOR_MAX_ROWS: int = 100000
+    # downsampling only holds the x and y of each row, so it reads more of them
+    EXECUTOR_MAX_DOWNSAMPLED_ROWS: int = 1000000
+    # connections may only reach public addresses unless enabled, e.g. for
+    # self hosted APIs or databases on the same network
+    EXECUTOR_ALLOW_PRIVATE_NETWORKS: bool = False
+    # queries override them with cache_ttl and cache_stale_ttl in their metadata
+    RESULT_CACHE_TTL: int = 30
+    RESULT_CACHE_STALE_SECONDS: int = 60
+    RESULT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LOG_LEVEL: str = "INFO"
+    # e.g. "INFO=0.1,WARNING=0.5", the levels left out are always logged
+    LOG_SAMPLE_RATES: str = ""
 
     class Config:
         env_file = ".env"
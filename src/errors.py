@@ -1,9 +1,9 @@
+import logging
 from fastapi import (
     HTTPException,
 )
-from fastapi.responses import (
-    JSONResponse,
-)
+from lib.log import logger
+from lib.responses import MongoJSONResponse
 
 ERR_INTERNAL = "D0"
 ERR_BAD_REQUEST = "D1"
@@ -12,6 +12,7 @@ ERR_DASHBOARD_NOT_FOUND = "D4"
 ERR_FOLDER_NOT_FOUND = "D5"
 ERR_CONNECTION_NOT_FOUND = "D6"
 ERR_QUERY_NOT_FOUND = "D7"
+ERR_QUERY_EXECUTION = "D8"
 
 
 class CustomException(HTTPException):
@@ -21,15 +22,21 @@ class CustomException(HTTPException):
         error_code: str,
         description: str,
     ):
-        self.status_code = status_code
+        super().__init__(status_code, description)
         self.error_code = error_code
         self.description = description
 
     def create_json_response(
         self,
     ):
-        print(f"Error: {self.error_code} - {self.description}")
-        return JSONResponse(
+        logger.log(
+            logging.ERROR if self.status_code >= 500 else logging.WARNING,
+            "Error: %s - %s",
+            self.error_code,
+            self.description,
+            extra={"status": self.status_code},
+        )
+        return MongoJSONResponse(
             status_code=self.status_code,
             content={
                 "error": {
@@ -45,13 +52,13 @@ Handler for exceptions raised due to validations errors in the request
 """
 
 
-def handle_validation_error(_, exc) -> JSONResponse:
+def handle_validation_error(_, exc) -> MongoJSONResponse:
     error_messages = []
     for error in exc.errors():
         field_name = error["loc"]
         error_messages.append(f"{field_name}: {error['msg']}")
     message = ", ".join(error_messages)
-    return JSONResponse(
+    return MongoJSONResponse(
         status_code=400,
         content={
             "error": {
@@ -62,5 +69,5 @@ def handle_validation_error(_, exc) -> JSONResponse:
     )
 
 
-def handle_custom_exception(_, exc) -> JSONResponse:
+def handle_custom_exception(_, exc) -> MongoJSONResponse:
     return exc.create_json_response()
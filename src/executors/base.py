@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import orjson
+from configs.settings import settings
+from errors import CustomException, ERR_BAD_REQUEST, ERR_QUERY_EXECUTION
+from executors.transform import aggregated, check, downsampled, grouped
+from lib.streaming import collect
+from lib.variables import resolve
+from schemas.query import ConnectionOnQueryResponse, Transform
+
+
+class PooledClient:
+    def __init__(self, client: Any, fingerprint: str):
+        self.client = client
+        self.fingerprint = fingerprint
+        self.last_used = time.monotonic()
+        self.leases = 0
+
+
+class Executor:
+    """
+    Runs queries against one type of connection. Keeps a pooled client per
+    connection, rebuilt when its credentials change and closed once it has
+    not been used for EXECUTOR_IDLE_SECONDS
+    """
+
+    def __init__(self):
+        self._clients: Dict[Any, PooledClient] = {}
+        # clients replaced while leased, closed once released
+        self._retired: List[PooledClient] = []
+        self._lock = asyncio.Lock()
+
+    async def create_client(self, credentials: dict) -> Any:
+        raise NotImplementedError
+
+    async def close_client(self, client: Any):
+        raise NotImplementedError
+
+    def resolve(self, metadata: dict, variables: dict) -> dict:
+        """
+        The metadata with its {{name}} placeholders replaced by the variables
+        """
+        return resolve(metadata, variables)
+
+    def rows(self, client: Any, metadata: dict) -> AsyncIterator[dict]:
+        """
+        Yields the rows of the query described by `metadata`, its variables
+        already resolved
+        """
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def lease(self, connection: ConnectionOnQueryResponse):
+        fingerprint = hashlib.sha256(
+            orjson.dumps(connection.credentials, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        async with self._lock:
+            await self._evict_idle()
+            pooled = self._clients.get(connection.id)
+            if pooled and pooled.fingerprint != fingerprint:
+                del self._clients[connection.id]
+                self._retired.append(pooled)
+                pooled = None
+            if not pooled:
+                try:
+                    client = await self.create_client(connection.credentials)
+                except CustomException:
+                    raise
+                except Exception as e:
+                    raise CustomException(
+                        502, ERR_QUERY_EXECUTION, f"Could not connect: {str(e)}"
+                    )
+                pooled = PooledClient(client, fingerprint)
+                self._clients[connection.id] = pooled
+            pooled.leases += 1
+        try:
+            yield pooled.client
+        finally:
+            pooled.leases -= 1
+            pooled.last_used = time.monotonic()
+
+    async def stream(
+        self, connection: ConnectionOnQueryResponse, metadata: dict
+    ) -> AsyncIterator[dict]:
+        """
+        Yields the rows as the source's cursor delivers them, holding the
+        connection's client until the stream is consumed or closed
+        """
+        async with self.lease(connection) as client:
+            try:
+                async for row in self.rows(client, metadata):
+                    yield row
+            except CustomException:
+                raise
+            except Exception as e:
+                raise CustomException(
+                    502, ERR_QUERY_EXECUTION, f"Error executing query: {str(e)}"
+                )
+
+    def pushdown(self, metadata: dict, transform: Transform) -> Optional[dict]:
+        """
+        Returns the metadata of a query grouping and ranking the rows as the
+        transform asks in the source itself, or None when it can not
+        """
+        return None
+
+    def transformed(
+        self, connection: ConnectionOnQueryResponse, metadata: dict, transform: Transform
+    ) -> AsyncIterator[dict]:
+        check(transform)
+        if grouped(transform) or transform.top_k:
+            pushed = self.pushdown(metadata, transform)
+            if pushed:
+                rows = self.stream(connection, pushed)
+            else:
+                rows = aggregated(self.stream(connection, metadata), transform)
+        else:
+            rows = self.stream(connection, metadata)
+        # LTTB walks the series in order, no source can run it
+        return downsampled(rows, transform) if transform.points else rows
+
+    async def execute(
+        self,
+        connection: ConnectionOnQueryResponse,
+        metadata: dict,
+        transform: Optional[Transform] = None,
+    ) -> List[dict]:
+        if transform:
+            return await collect(self.transformed(connection, metadata, transform))
+        return await collect(self.stream(connection, metadata))
+
+    async def evict_idle(self):
+        async with self._lock:
+            await self._evict_idle()
+
+    async def _evict_idle(self):
+        idle_since = time.monotonic() - settings.EXECUTOR_IDLE_SECONDS
+        for key, pooled in list(self._clients.items()):
+            if not pooled.leases and pooled.last_used < idle_since:
+                del self._clients[key]
+                await self.close_client(pooled.client)
+        for pooled in [pooled for pooled in self._retired if not pooled.leases]:
+            self._retired.remove(pooled)
+            await self.close_client(pooled.client)
+
+    async def close(self):
+        async with self._lock:
+            for pooled in [*self._clients.values(), *self._retired]:
+                await self.close_client(pooled.client)
+            self._clients.clear()
+            self._retired.clear()
+
+
+def required(values: dict, key: str, description: str) -> Any:
+    if not values.get(key):
+        raise CustomException(400, ERR_BAD_REQUEST, f"Missing {key} in {description}")
+    return values[key]
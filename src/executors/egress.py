@@ -0,0 +1,67 @@
+import asyncio
+import ipaddress
+import socket
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from configs.settings import settings
+from errors import CustomException, ERR_BAD_REQUEST, ERR_QUERY_EXECUTION
+
+
+def is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_hosts(hosts: Iterable[Tuple[str, Optional[int]]]):
+    """
+    Refuses loopback, link-local and private addresses and unix sockets, the
+    connections come from users and could reach the cloud metadata endpoint,
+    our own database or internal services otherwise
+    """
+    if settings.EXECUTOR_ALLOW_PRIVATE_NETWORKS:
+        return
+    loop = asyncio.get_running_loop()
+    for host, port in hosts:
+        if not host or host.startswith("/"):
+            raise CustomException(
+                400, ERR_BAD_REQUEST, "Connections to local sockets are not allowed"
+            )
+        try:
+            addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise CustomException(
+                502, ERR_QUERY_EXECUTION, f"Could not resolve {host}: {e}"
+            )
+        if not all(is_public(address[4][0]) for address in addresses):
+            raise CustomException(
+                400, ERR_BAD_REQUEST, f"Connections to {host} are not allowed"
+            )
+
+
+def split_host(host: str, default_port: int) -> Tuple[str, int]:
+    if host.startswith("["):
+        address, _, port = host[1:].partition("]")
+        port = port.lstrip(":")
+    elif host.count(":") == 1:
+        address, port = host.split(":")
+    else:
+        address, port = host, ""
+    return unquote(address), int(port) if port else default_port
+
+
+def postgres_hosts(uri: str) -> List[Tuple[str, int]]:
+    """
+    The hosts libpq style URIs connect to, several may be listed and a host
+    query parameter overrides them. No host means the local socket
+    """
+    parts = urlsplit(uri)
+    query = parse_qs(parts.query)
+    netloc = parts.netloc.rpartition("@")[2]
+    hosts = ",".join(query["host"]) if "host" in query else netloc
+    ports = ",".join(query.get("port", [])).split(",")
+    return [
+        split_host(host, int(ports[min(index, len(ports) - 1)] or 5432))
+        for index, host in enumerate(hosts.split(","))
+    ]
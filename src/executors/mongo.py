@@ -0,0 +1,154 @@
+import asyncio
+from typing import AsyncIterator, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ConfigurationError
+from pymongo.uri_parser import parse_uri
+from configs.settings import settings
+from errors import CustomException, ERR_BAD_REQUEST
+from executors.base import Executor, required
+from executors.egress import check_hosts
+from executors.transform import aggregations, grouped, keys, sort_key
+from schemas.query import AggregateFunction, Transform
+
+WRITE_STAGES = ("$out", "$merge")
+ACCUMULATORS = {
+    AggregateFunction.SUM: "$sum",
+    AggregateFunction.AVG: "$avg",
+    AggregateFunction.MIN: "$min",
+    AggregateFunction.MAX: "$max",
+}
+# numbers summed by each sum, kept apart from the names of the aggregations
+COUNTED_PREFIX = "__counted_"
+
+
+class MongoSource:
+    """
+    A connection's client along with the database its credentials name
+    """
+
+    def __init__(self, client: AsyncIOMotorClient, database: Optional[str] = None):
+        self.client = client
+        self.database = database
+
+
+class MongoExecutor(Executor):
+    """
+    Runs a find or an aggregation on a collection of the connection's database:
+
+        credentials: {"uri": "mongodb://...", "database": "shop"}
+        metadata: {
+            "collection": "orders", "filter": {...}, "projection": {...},
+            "sort": {"created": -1}, "limit": 100
+        }
+        or {"collection": "orders", "pipeline": [...]}
+
+    The database of the credentials is used, then the one in the metadata
+    and finally the one in the uri
+    """
+
+    async def create_client(self, credentials: dict) -> MongoSource:
+        uri = required(credentials, "uri", "the connection credentials")
+        # mongodb+srv URIs are resolved to their hosts with a blocking lookup
+        await check_hosts((await asyncio.to_thread(parse_uri, uri))["nodelist"])
+        client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=settings.EXECUTOR_POOL_SIZE,
+            serverSelectionTimeoutMS=int(settings.EXECUTOR_TIMEOUT_SECONDS * 1000),
+        )
+        return MongoSource(client, credentials.get("database"))
+
+    async def close_client(self, source: MongoSource):
+        source.client.close()
+
+    def cursor(self, source: MongoSource, metadata: dict):
+        name = source.database or metadata.get("database")
+        try:
+            database = (
+                source.client[name] if name else source.client.get_default_database()
+            )
+        except ConfigurationError:
+            raise CustomException(
+                400, ERR_BAD_REQUEST, "Missing database in the connection credentials"
+            )
+        collection = database[required(metadata, "collection", "the query metadata")]
+        if "pipeline" in metadata:
+            pipeline = metadata["pipeline"]
+            if any(stage in WRITE_STAGES for step in pipeline for stage in step):
+                raise CustomException(
+                    400, ERR_BAD_REQUEST, "Query pipelines can not write to collections"
+                )
+            return collection.aggregate(pipeline, batchSize=settings.EXECUTOR_BATCH_SIZE)
+        return collection.find(
+            metadata.get("filter") or {},
+            metadata.get("projection"),
+            sort=list((metadata.get("sort") or {}).items()) or None,
+            limit=metadata.get("limit") or 0,
+            batch_size=settings.EXECUTOR_BATCH_SIZE,
+        )
+
+    def stages(self, metadata: dict) -> List[dict]:
+        """
+        The query as aggregation stages, finds included
+        """
+        if "pipeline" in metadata:
+            return list(metadata["pipeline"])
+        stages = [{"$match": metadata.get("filter") or {}}]
+        if metadata.get("sort"):
+            stages.append({"$sort": metadata["sort"]})
+        if metadata.get("limit"):
+            stages.append({"$limit": metadata["limit"]})
+        if metadata.get("projection"):
+            stages.append({"$project": metadata["projection"]})
+        return stages
+
+    def pushdown(self, metadata: dict, transform: Transform) -> dict:
+        stages = self.stages(metadata)
+        if grouped(transform):
+            group = {column: f"${column}" for column in transform.group_by}
+            if transform.interval:
+                time = {"$toLong": f"${transform.time_column}"}
+                interval = transform.interval * 1000
+                group[transform.time_column] = {
+                    "$toDate": {"$subtract": [time, {"$mod": [time, interval]}]}
+                }
+            accumulators, projected = {}, {}
+            for aggregation in aggregations(transform):
+                name, column = aggregation.name, f"${aggregation.column}"
+                projected[name] = 1
+                if aggregation.function == AggregateFunction.COUNT:
+                    accumulators[name] = {"$sum": 1}
+                    continue
+                accumulators[name] = {ACCUMULATORS[aggregation.function]: column}
+                if aggregation.function == AggregateFunction.SUM:
+                    # $sum of no numbers is 0, the other sources return null
+                    counted = f"{COUNTED_PREFIX}{name}"
+                    accumulators[counted] = {
+                        "$sum": {"$cond": [{"$isNumber": column}, 1, 0]}
+                    }
+                    projected[name] = {
+                        "$cond": [{"$gt": [f"${counted}", 0]}, f"${name}", None]
+                    }
+            stages.append({"$group": {"_id": group or None, **accumulators}})
+            stages.append(
+                {
+                    "$project": {
+                        "_id": 0,
+                        **{column: f"$_id.{column}" for column in group},
+                        **projected,
+                    }
+                }
+            )
+            if group and not transform.top_k:
+                # the time bucket goes first, as in the other sources
+                order = sorted(
+                    keys(transform), key=lambda key: key != transform.time_column
+                )
+                stages.append({"$sort": {column: 1 for column in order}})
+        if transform.top_k:
+            stages.append({"$sort": {sort_key(transform): -1}})
+            stages.append({"$limit": transform.top_k})
+        return {**metadata, "pipeline": stages}
+
+    async def rows(self, source: MongoSource, metadata: dict) -> AsyncIterator[dict]:
+        async for document in self.cursor(source, metadata):
+            yield document
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Optional
+from models.connection import ConnectionType
+from configs.settings import settings
+from executors.base import Executor
+from executors.mongo import MongoExecutor
+from executors.postgres import PostgresExecutor
+from executors.rest import RestExecutor
+from lib.log import logger
+
+executors = {
+    ConnectionType.REST: RestExecutor(),
+    ConnectionType.MONGO: MongoExecutor(),
+    ConnectionType.POSTGRES: PostgresExecutor(),
+}
+_reaper: Optional[asyncio.Task] = None
+
+
+def get_executor(connection_type: str) -> Executor:
+    return executors[ConnectionType(connection_type)]
+
+
+async def evict_idle_clients():
+    """
+    Closes the idle clients of every executor now and then, leases only
+    evict them when queries come in
+    """
+    while True:
+        await asyncio.sleep(max(settings.EXECUTOR_IDLE_SECONDS / 2, 1))
+        for executor in executors.values():
+            try:
+                await executor.evict_idle()
+            except Exception as e:
+                logger.warning("Could not close idle clients: %s", e)
+
+
+def start_executors():
+    global _reaper
+    _reaper = asyncio.create_task(evict_idle_clients())
+
+
+async def close_executors():
+    global _reaper
+    if _reaper:
+        _reaper.cancel()
+        try:
+            await _reaper
+        except asyncio.CancelledError:
+            pass
+        _reaper = None
+    for executor in executors.values():
+        await executor.close()
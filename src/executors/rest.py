@@ -0,0 +1,56 @@
+from typing import Any, AsyncIterator
+import httpx
+from configs.settings import settings
+from executors.base import Executor, required
+from executors.egress import check_hosts
+
+
+async def check_egress(request: httpx.Request):
+    await check_hosts([(request.url.host, request.url.port or 443)])
+
+
+class RestExecutor(Executor):
+    """
+    Reads JSON from the connection's API:
+
+        credentials: {"main_url": "https://api.example.com", "headers": {...}}
+        metadata: {
+            "method": "GET", "path": "/sales", "params": {...}, "headers": {...},
+            "body": {...}, "rows_path": "data.items"
+        }
+
+    The response, or the value at the dotted `rows_path`, holds the rows.
+    A single object is returned as one row
+    """
+
+    async def create_client(self, credentials: dict) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=required(credentials, "main_url", "the connection credentials"),
+            headers=credentials.get("headers") or {},
+            timeout=settings.EXECUTOR_TIMEOUT_SECONDS,
+            # also runs for absolute paths, which override the main_url
+            event_hooks={"request": [check_egress]},
+        )
+
+    async def close_client(self, client: httpx.AsyncClient):
+        await client.aclose()
+
+    async def fetch(self, client: httpx.AsyncClient, metadata: dict) -> Any:
+        response = await client.request(
+            metadata.get("method", "GET"),
+            metadata.get("path", ""),
+            params=metadata.get("params"),
+            headers=metadata.get("headers"),
+            json=metadata.get("body"),
+        )
+        response.raise_for_status()
+        data = response.json()
+        for key in filter(None, metadata.get("rows_path", "").split(".")):
+            data = data[key]
+        return data if isinstance(data, list) else [data]
+
+    async def rows(
+        self, client: httpx.AsyncClient, metadata: dict
+    ) -> AsyncIterator[dict]:
+        for row in await self.fetch(client, metadata):
+            yield row
@@ -0,0 +1,297 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Tuple
+from bson import Decimal128
+from configs.settings import settings
+from errors import CustomException, ERR_BAD_REQUEST
+from lib.streaming import collect
+from schemas.query import AggregateFunction, Aggregation, Transform
+
+
+def grouped(transform: Transform) -> bool:
+    return bool(transform.group_by or transform.interval or transform.aggregations)
+
+
+def aggregations(transform: Transform) -> List[Aggregation]:
+    return transform.aggregations or [Aggregation()]
+
+
+def keys(transform: Transform) -> List[str]:
+    """
+    Columns of the groups, the time bucket last
+    """
+    return [*transform.group_by, *([transform.time_column] if transform.interval else [])]
+
+
+def sort_key(transform: Transform) -> str:
+    return transform.sort_by or aggregations(transform)[0].name
+
+
+def x_column(transform: Transform) -> str:
+    return transform.x or transform.time_column
+
+
+def check(transform: Transform):
+    def invalid(description: str):
+        raise CustomException(400, ERR_BAD_REQUEST, f"Invalid transform: {description}")
+
+    if transform.interval and not transform.time_column:
+        invalid("interval needs a time_column")
+    for aggregation in transform.aggregations:
+        if aggregation.function != AggregateFunction.COUNT and not aggregation.column:
+            invalid(f"{aggregation.function.value} needs a column")
+    if transform.top_k and not grouped(transform) and not transform.sort_by:
+        invalid("top_k needs a sort_by column")
+    if grouped(transform) and transform.sort_by:
+        columns = [*keys(transform), *(a.name for a in aggregations(transform))]
+        if transform.sort_by not in columns:
+            invalid(f"sort_by must be one of {', '.join(columns)}")
+    if transform.points and not (transform.y and x_column(transform)):
+        invalid("points needs y and either x or time_column columns")
+
+
+def require_numpy():
+    """
+    numpy is an optional dependency, installed with the transforms extra
+    """
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        raise CustomException(
+            400, ERR_BAD_REQUEST, "Transforms are not available on this server"
+        )
+
+
+def numbers(np, values: list, column: str):
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        raise CustomException(
+            400, ERR_BAD_REQUEST, f"Column {column} does not hold numbers"
+        )
+
+
+def times(np, values: list, column: str):
+    """
+    Milliseconds since the epoch of datetimes or ISO 8601 strings, NaN for
+    missing ones
+    """
+    try:
+        values = np.array(values, dtype="datetime64[ms]")
+        return np.where(np.isnat(values), np.nan, values.astype("int64"))
+    except (TypeError, ValueError):
+        raise CustomException(
+            400, ERR_BAD_REQUEST, f"Column {column} does not hold times"
+        )
+
+
+def factorize(np, values: list):
+    """
+    Codes of the distinct values, in order of appearance
+    """
+    codes = {}
+    try:
+        coded = [codes.setdefault(value, len(codes)) for value in values]
+    except TypeError:
+        raise CustomException(400, ERR_BAD_REQUEST, "Can not group by nested values")
+    return np.array(coded, dtype=int), list(codes)
+
+
+def aggregate(rows: List[dict], transform: Transform) -> List[dict]:
+    """
+    Groups the rows in memory, for sources the transform can not be pushed
+    down to
+    """
+    np = require_numpy()
+    columns, codes = [], []
+    for column in transform.group_by:
+        column_codes, values = factorize(np, [row.get(column) for row in rows])
+        codes.append(column_codes)
+        columns.append((column, values))
+    if transform.interval:
+        interval = transform.interval * 1000
+        buckets = times(
+            np, [row.get(transform.time_column) for row in rows], transform.time_column
+        )
+        # rows without a time are grouped in a last bucket
+        values, bucket_codes = np.unique(
+            buckets // interval * interval, return_inverse=True, equal_nan=True
+        )
+        values = [
+            None if value != value else np.datetime64(int(value), "ms").item()
+            for value in values
+        ]
+        # the time bucket goes first so groups are sorted by it
+        codes.insert(0, bucket_codes.reshape(-1))
+        columns.insert(0, (transform.time_column, values))
+    if codes:
+        groups, inverse = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    else:
+        # aggregating every row into one
+        groups = np.zeros((1 if rows else 0, 0), dtype=int)
+        inverse = np.zeros(len(rows), dtype=int)
+    size = len(groups)
+    counts = np.bincount(inverse, minlength=size)
+    results = {}
+    for aggregation in aggregations(transform):
+        if aggregation.function == AggregateFunction.COUNT:
+            results[aggregation.name] = counts
+            continue
+        values = numbers(
+            np, [row.get(aggregation.column) for row in rows], aggregation.column
+        )
+        present = ~np.isnan(values)
+        if aggregation.function in (AggregateFunction.MIN, AggregateFunction.MAX):
+            result = np.full(size, np.nan)
+            reduce = np.fmin if aggregation.function == AggregateFunction.MIN else np.fmax
+            reduce.at(result, inverse, values)
+        else:
+            result = np.bincount(
+                inverse, weights=np.where(present, values, 0), minlength=size
+            )
+            present_counts = np.bincount(inverse, weights=present, minlength=size)
+            if aggregation.function == AggregateFunction.AVG:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = result / present_counts
+            else:
+                # as in SQL, the sum of no values is null rather than 0
+                result = np.where(present_counts > 0, result, np.nan)
+        results[aggregation.name] = result
+    aggregated = []
+    for index, group in enumerate(groups):
+        row = {column: values[code] for (column, values), code in zip(columns, group)}
+        for name, result in results.items():
+            value = result[index].item()
+            row[name] = None if value != value else value
+        aggregated.append(row)
+    # the time bucket was moved first to sort on it, output the columns as asked
+    return [
+        {column: row[column] for column in [*keys(transform), *results]}
+        for row in aggregated
+    ]
+
+
+SORTABLE_TYPES = {
+    "numbers": (int, float, Decimal, Decimal128),
+    "strings": (str,),
+    "times": (datetime, date),
+}
+
+
+def sortable(value: Any, column: str) -> Tuple[str, Any]:
+    """
+    The kind of the value along with a key comparable with the values of
+    the same kind
+    """
+    for kind, types in SORTABLE_TYPES.items():
+        if isinstance(value, types):
+            if isinstance(value, Decimal128):
+                value = value.to_decimal()
+            if isinstance(value, date) and not isinstance(value, datetime):
+                value = datetime.combine(value, datetime.min.time())
+            return kind, value
+    raise CustomException(
+        400, ERR_BAD_REQUEST, f"Can not sort by {column}, it holds {type(value).__name__}"
+    )
+
+
+def top(rows: List[dict], transform: Transform) -> List[dict]:
+    column = sort_key(transform)
+    ranked, missing = [], []
+    for row in rows:
+        value = row.get(column)
+        # NaN is not ordered, it is missing as None
+        if value is None or value != value:
+            missing.append(row)
+        else:
+            ranked.append((sortable(value, column), row))
+    kinds = {kind for (kind, _), _ in ranked}
+    if len(kinds) > 1:
+        raise CustomException(
+            400,
+            ERR_BAD_REQUEST,
+            f"Can not sort by {column}, it mixes {' and '.join(sorted(kinds))}",
+        )
+    try:
+        ranked.sort(key=lambda item: item[0][1], reverse=True)
+    except TypeError:
+        # e.g. naive and timezone aware datetimes
+        raise CustomException(
+            400, ERR_BAD_REQUEST, f"Can not sort by {column}, its values do not compare"
+        )
+    # rows without a value go last
+    return [*(row for _, row in ranked), *missing][: transform.top_k]
+
+
+async def aggregated(
+    rows: AsyncIterator[dict], transform: Transform
+) -> AsyncIterator[dict]:
+    collected = await collect(rows)
+    if grouped(transform):
+        collected = aggregate(collected, transform)
+    if transform.top_k:
+        collected = top(collected, transform)
+    for row in collected:
+        yield row
+
+
+def lttb(np, x, y, points: int):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets: the first
+    and last ones, and from each bucket in between the one making the largest
+    triangle with the previous point kept and the average of the next bucket
+    """
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, points - 1).astype(int)
+    kept = np.empty(points, dtype=int)
+    kept[0], kept[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        average_x, average_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+async def downsampled(
+    rows: AsyncIterator[dict], transform: Transform
+) -> AsyncIterator[dict]:
+    """
+    Keeps only the x and y values of the rows, so series larger than
+    EXECUTOR_MAX_ROWS can be downsampled, up to EXECUTOR_MAX_DOWNSAMPLED_ROWS
+    """
+    np = require_numpy()
+    x_name, y_name = x_column(transform), transform.y
+    xs, ys = [], []
+    try:
+        async for row in rows:
+            if len(xs) == settings.EXECUTOR_MAX_DOWNSAMPLED_ROWS:
+                raise CustomException(
+                    400,
+                    ERR_BAD_REQUEST,
+                    "Query returned more than "
+                    f"{settings.EXECUTOR_MAX_DOWNSAMPLED_ROWS} rows to downsample, "
+                    "filter or aggregate them instead",
+                )
+            xs.append(row.get(x_name))
+            ys.append(row.get(y_name))
+    finally:
+        await rows.aclose()
+    y = numbers(np, ys, y_name)
+    numeric = all(isinstance(value, (int, float)) for value in xs if value is not None)
+    x = numbers(np, xs, x_name) if numeric else times(np, xs, x_name)
+    present = np.flatnonzero(~np.isnan(x) & ~np.isnan(y))
+    present = present[np.argsort(x[present], kind="stable")]
+    for index in present[lttb(np, x[present], y[present], transform.points)]:
+        yield {x_name: xs[index], y_name: ys[index]}
@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, Optional
+
+
+class LRUCache:
+    """
+    Bounded least recently used cache whose entries expire after `ttl` seconds.
+    Every invalidation bumps `generation`, so a value read from the database
+    before a write can not be stored after the write evicted it
+    """
+
+    def __init__(self, max_size: int, ttl: float, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """
+        Returns the cached values of `keys`, leaving out the missing ones
+        """
+        values = (self.get(key) for key in set(keys))
+        return [value for value in values if value is not None]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        `generation` is the one read before loading `value`, the value is
+        dropped when anything was invalidated in between
+        """
+        if not self.enabled or generation not in (None, self.generation):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        self.generation += 1
+        for key, (_, value) in list(self._entries.items()):
+            if predicate(value):
+                del self._entries[key]
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
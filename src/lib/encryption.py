@@ -1,14 +1,77 @@
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Any
+import orjson
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from configs.settings import settings
+from lib.log import logger
+
+
+@lru_cache(maxsize=1)
+def get_cipher() -> MultiFernet:
+    """
+    PRIVATE_KEY may hold several comma separated keys to rotate them:
+    the first one encrypts and every one of them can decrypt
+    """
+    keys = [key.strip() for key in settings.PRIVATE_KEY.split(",") if key.strip()]
+    return MultiFernet([Fernet(key.encode()) for key in keys])
 
 
 def encrypt(data: str) -> str:
-    key = settings.PRIVATE_KEY.encode()
-    f = Fernet(key)
-    return f.encrypt(data.encode()).decode()
+    return get_cipher().encrypt(data.encode()).decode()
 
 
 def decrypt(data: str) -> str:
-    key = settings.PRIVATE_KEY.encode()
-    f = Fernet(key)
-    return f.decrypt(data.encode()).decode()
+    return get_cipher().decrypt(data.encode()).decode()
+
+
+def preview(data: str) -> str:
+    return "*" * 5 + data[-4:]
+
+
+# credentials kept readable, they hold no secret
+PLAIN_CREDENTIALS = {"main_url", "database", "openai_api_key_preview"}
+# the api key is stored as a bare token, see services/connection.py
+OPENAI_API_KEY = "openai_api_key"
+SEALED_PREFIX = "encrypted:"
+
+
+def is_sealed(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(SEALED_PREFIX)
+
+
+def sealed(key: str) -> bool:
+    """
+    Whether the credential under `key` is stored encrypted by seal_credentials
+    """
+    return key not in PLAIN_CREDENTIALS and key != OPENAI_API_KEY
+
+
+def seal_credentials(credentials: dict) -> dict:
+    """
+    Encrypts the credentials to store them, values already sealed are kept
+    as they are so they are never encrypted twice
+    """
+    return {
+        key: (
+            SEALED_PREFIX + encrypt(orjson.dumps(value).decode())
+            if sealed(key) and not is_sealed(value)
+            else value
+        )
+        for key, value in credentials.items()
+    }
+
+
+def open_credentials(credentials: dict) -> dict:
+    """
+    Decrypts the credentials sealed by seal_credentials. A value encrypted
+    with a key that is no longer configured is left sealed
+    """
+    opened = {}
+    for key, value in credentials.items():
+        opened[key] = value
+        if sealed(key) and is_sealed(value):
+            try:
+                opened[key] = orjson.loads(decrypt(value[len(SEALED_PREFIX) :]))
+            except (InvalidToken, orjson.JSONDecodeError):
+                logger.warning("Could not decrypt the %s credential", key)
+    return opened
@@ -0,0 +1,19 @@
+from typing import Optional, Set, Type
+from pydantic import BaseModel
+from errors import CustomException, ERR_BAD_REQUEST
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Set[str]]:
+    """
+    Parses a comma separated `fields` parameter into a set of `model` fields,
+    None means every field was requested
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise CustomException(
+            400, ERR_BAD_REQUEST, f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested
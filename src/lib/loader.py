@@ -0,0 +1,89 @@
+import asyncio
+from contextvars import ContextVar
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class DataLoader:
+    """
+    Coalesces the loads issued in the same event loop tick into a single
+    `batch_load` call and memoizes their results
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[Hashable]], Awaitable[List[Any]]],
+        key: Callable[[Any], Hashable] = attrgetter("id"),
+    ):
+        self.batch_load = batch_load
+        self.key = key
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        # futures are kept with their keys, clear() may drop them from _results
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self._dispatch_task = None
+
+    def load(self, key: Hashable) -> Awaitable[Optional[Any]]:
+        if key not in self._results:
+            self._results[key] = asyncio.get_running_loop().create_future()
+            if not self._pending:
+                self._dispatch_task = asyncio.create_task(self._dispatch())
+            self._pending.append((key, self._results[key]))
+        return self._results[key]
+
+    def clear(self):
+        # loads in flight still resolve their own futures
+        self._results = {}
+
+    async def _dispatch(self):
+        pending, self._pending = self._pending, []
+        # a key loaded again after clear() is queued twice
+        keys = list(dict.fromkeys(key for key, _ in pending))
+        try:
+            items = await self.batch_load(keys)
+        except Exception as e:
+            for key, future in pending:
+                if self._results.get(key) is future:
+                    del self._results[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+        found = {self.key(item): item for item in items}
+        for key, future in pending:
+            # cancelled when the request awaiting it was
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+# Set by LoaderMiddleware for the duration of each request
+request_loaders: ContextVar[Optional[Dict[str, DataLoader]]] = ContextVar(
+    "request_loaders", default=None
+)
+
+
+def get_loader(name: str, batch_load: Callable) -> Optional[DataLoader]:
+    loaders = request_loaders.get()
+    if loaders is None:
+        return None
+    if name not in loaders:
+        loaders[name] = DataLoader(batch_load)
+    return loaders[name]
+
+
+def clear_loaders():
+    for loader in (request_loaders.get() or {}).values():
+        loader.clear()
+
+
+class LoaderMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_loaders.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_loaders.reset(token)
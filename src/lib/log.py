@@ -0,0 +1,152 @@
+import copy
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+import orjson
+from configs.settings import settings
+
+logger = logging.getLogger("dashboards")
+
+# Set by RequestLoggingMiddleware, the scope tells the route once it is matched
+request_context: ContextVar[Optional[dict]] = ContextVar("request_context", default=None)
+
+CONTEXT_FIELDS = ("request_id", "route", "user_id", "status", "latency_ms")
+
+
+def parse_sample_rates(rates: str) -> Dict[int, float]:
+    """
+    Parses LOG_SAMPLE_RATES, e.g. "INFO=0.1,WARNING=0.5", levels left out
+    are always logged
+    """
+    sample_rates = {}
+    for rate in filter(None, (rate.strip() for rate in rates.split(","))):
+        level, value = rate.split("=")
+        sample_rates[logging.getLevelName(level.strip().upper())] = float(value)
+    return sample_rates
+
+
+class ContextFilter(logging.Filter):
+    """
+    Drops the records out of their level's sample and attaches the request
+    context to the rest. It runs on the QueueHandler, in the thread that logs
+    the record, where the request's context variables are still readable
+    """
+
+    def __init__(self, sample_rates: Dict[int, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = self.sample_rates.get(record.levelno, 1.0)
+        if sample_rate < 1.0:
+            if random.random() >= sample_rate:
+                return False
+            record.sample_rate = sample_rate
+        context = request_context.get()
+        if context:
+            route = context["scope"].get("route")
+            record.request_id = context["request_id"]
+            record.route = route.path if route else None
+            record.user_id = context["user_id"]
+        return True
+
+
+class JsonQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Renders the message and the traceback before queueing, like
+        QueueHandler does, but keeps the traceback out of the message so it is
+        written as its own field
+        """
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in (*CONTEXT_FIELDS, "sample_rate"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+def configure_logging() -> QueueListener:
+    """
+    Queues the records so the event loop never blocks writing them, the
+    returned listener writes them from its own thread once started
+    """
+    records = queue.SimpleQueue()
+    handler = JsonQueueHandler(records)
+    handler.addFilter(ContextFilter(parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+    logger.handlers = [handler]
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.propagate = False
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    return QueueListener(records, output)
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        query = parse_qs(scope.get("query_string", b"").decode())
+        context = {
+            "scope": scope,
+            "request_id": headers.get(b"x-request-id", b"").decode() or uuid.uuid4().hex,
+            "user_id": query.get("user_id", [None])[0],
+        }
+        token = request_context.set(context)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", context["request_id"].encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            logger.info(
+                "%s %s",
+                scope["method"],
+                scope["path"],
+                extra={
+                    "status": status,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+                },
+            )
+            request_context.reset(token)
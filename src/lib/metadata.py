@@ -0,0 +1,32 @@
+from typing import Any, List
+from bson import ObjectId
+
+QUERY_ID_KEYS = ("query_id", "queryId")
+
+
+def as_object_id(value: Any) -> ObjectId | None:
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and len(value) == 24 and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return None
+
+
+def referenced_query_ids(metadata: Any) -> List[ObjectId]:
+    """
+    Walks a dashboard's metadata collecting the ids of the queries used by its
+    widgets, either as `query_id`/`queryId` or as the id of a `query` object
+    """
+    query_ids = set()
+    if isinstance(metadata, dict):
+        for key, value in metadata.items():
+            if key in QUERY_ID_KEYS:
+                query_ids.add(as_object_id(value))
+            elif key == "query" and isinstance(value, dict):
+                query_ids.add(as_object_id(value.get("id", value.get("_id"))))
+            query_ids.update(referenced_query_ids(value))
+    elif isinstance(metadata, list):
+        for value in metadata:
+            query_ids.update(referenced_query_ids(value))
+    query_ids.discard(None)
+    return list(query_ids)
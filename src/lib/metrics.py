@@ -0,0 +1,140 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from lib.cache import LRUCache
+from lib.pool import PoolMetrics
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of the HTTP requests by route",
+    ["method", "route", "status"],
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "Latency of the Mongo commands by the repository method sending them",
+    ["operation", "command"],
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total",
+    "Mongo commands that failed by the repository method sending them",
+    ["operation", "command"],
+)
+
+# Repository method running in the current context, commands sent outside of
+# the repositories (startup checks, change streams) are tagged as "other"
+current_operation: ContextVar[str] = ContextVar("current_operation", default="other")
+
+
+def traced(operation: str, fn: Callable) -> Callable:
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(operation)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+
+    return wrapper
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Times the Mongo commands, Motor runs them in threads that copy the
+    context so `current_operation` still names the calling method
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_LATENCY.labels(current_operation.get(), event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        labels = (current_operation.get(), event.command_name)
+        MONGO_COMMAND_LATENCY.labels(*labels).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+
+class CacheCollector:
+    def __init__(self, caches: Dict[str, LRUCache]):
+        self.caches = caches
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily(
+            "cache_hit_ratio", "Hits over lookups since startup", labels=["cache"]
+        )
+        for name, cache in self.caches.items():
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            lookups = cache.hits + cache.misses
+            ratio.add_metric([name], cache.hits / lookups if lookups else 0)
+        return [hits, misses, ratio]
+
+
+class PoolCollector:
+    def __init__(self, pool_metrics: PoolMetrics):
+        self.pool_metrics = pool_metrics
+
+    def collect(self):
+        snapshot = self.pool_metrics.snapshot()
+        yield GaugeMetricFamily(
+            "mongo_pool_connections_open", "Open connections", snapshot["open"]
+        )
+        yield GaugeMetricFamily(
+            "mongo_pool_connections_checked_out",
+            "Connections in use",
+            snapshot["checked_out"],
+        )
+        yield CounterMetricFamily(
+            "mongo_pool_checkouts", "Connection checkouts", snapshot["checkouts"]
+        )
+        yield CounterMetricFamily(
+            "mongo_pool_checkout_failures",
+            "Connection checkouts that failed or timed out",
+            snapshot["checkout_failures"],
+        )
+        yield CounterMetricFamily(
+            "mongo_pool_wait_seconds",
+            "Time spent waiting for a connection",
+            snapshot["wait_seconds_total"],
+        )
+        yield GaugeMetricFamily(
+            "mongo_pool_wait_seconds_max",
+            "Longest wait for a connection since startup",
+            snapshot["wait_seconds_max"],
+        )
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the route template keeps the label cardinality bounded
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], route.path if route else "unmatched", status
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,29 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import List
+from errors import CustomException, ERR_BAD_REQUEST
+from schemas.pagination import Page
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    return urlsafe_b64encode(ObjectId(last_id).binary).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        return ObjectId(urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError, InvalidId):
+        raise CustomException(400, ERR_BAD_REQUEST, "Invalid pagination cursor")
+
+
+def paginate(items: List[dict], limit: int) -> Page:
+    """
+    Builds a page from raw rows fetched with `limit + 1` rows, the extra row
+    only tells us whether there is a next page
+    """
+    if len(items) <= limit:
+        return Page(items=items)
+    items = items[:limit]
+    return Page(items=items, next_cursor=encode_cursor(items[-1]["_id"]))
@@ -0,0 +1,38 @@
+import base64
+from decimal import Decimal
+from typing import Any
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    # query results are mostly plotted, numbers beat exact strings there
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        # shallow on purpose, orjson calls back here for nested models
+        return {
+            field.alias or name: getattr(value, name)
+            for name, field in value.model_fields.items()
+        }
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode()
+    # drivers return types orjson does not know, e.g. intervals or geometries,
+    # a string beats failing the whole response halfway through
+    return str(value)
+
+
+class MongoJSONResponse(JSONResponse):
+    """
+    Default response of the app, written with orjson. Besides datetimes it
+    handles ObjectIds, so raw documents from Mongo can be returned as they are
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import orjson
+from lib.log import logger
+from lib.responses import default
+
+
+class CachedResult:
+    def __init__(self, value: Any, size: int, ttl: float, stale_ttl: float):
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+
+
+def result_key(*parts: Any) -> str:
+    return hashlib.sha256(
+        orjson.dumps(parts, default=default, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    Least recently used cache bounded by the JSON size of its values. Stale
+    values are served while a single background load refreshes them, and
+    concurrent misses of a key share one load
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedResult]" = OrderedDict()
+        self._loads: Dict[Hashable, asyncio.Task] = {}
+
+    async def get(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0,
+    ) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if now >= entry.fresh_until:
+                self._load(key, load, ttl, stale_ttl)
+            return entry.value
+        self.misses += 1
+        # shielded so a client going away does not cancel the shared load
+        return await asyncio.shield(self._load(key, load, ttl, stale_ttl))
+
+    def invalidate(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.bytes -= entry.size
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _load(self, key, load, ttl, stale_ttl) -> asyncio.Task:
+        task = self._loads.get(key)
+        if not task:
+            task = asyncio.create_task(self._store(key, load, ttl, stale_ttl))
+            self._loads[key] = task
+            task.add_done_callback(lambda task: self._loaded(key, task))
+        return task
+
+    def _loaded(self, key: Hashable, task: asyncio.Task):
+        self._loads.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.warning("Loading a cached result failed: %s", task.exception())
+
+    async def _store(self, key, load, ttl, stale_ttl) -> Any:
+        value = await load()
+        if ttl <= 0:
+            return value
+        size = len(orjson.dumps(value, default=default))
+        if size > self.max_bytes:
+            return value
+        self.invalidate(key)
+        self._entries[key] = CachedResult(value, size, ttl, stale_ttl)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+        return value
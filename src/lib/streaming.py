@@ -0,0 +1,223 @@
+from datetime import datetime
+from typing import AsyncIterator, List
+import orjson
+from configs.settings import settings
+from errors import CustomException, ERR_BAD_REQUEST, ERR_QUERY_EXECUTION
+from lib.log import logger
+from lib.responses import default
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# rows are sent in chunks of about this size, each send waits for the client
+CHUNK_SIZE = 64 * 1024
+
+
+def accepts(accept: str | None, media_type: str) -> bool:
+    return bool(accept) and media_type in accept
+
+
+async def prefetched(rows: AsyncIterator) -> AsyncIterator:
+    """
+    Pulls the first row before the response starts, so errors connecting
+    or running the query still get their status code
+    """
+    try:
+        first = await anext(rows)
+    except StopAsyncIteration:
+        return empty()
+    except BaseException:
+        await rows.aclose()
+        raise
+    return chained(first, rows)
+
+
+async def empty() -> AsyncIterator:
+    return
+    yield
+
+
+async def chained(first, rows: AsyncIterator) -> AsyncIterator:
+    try:
+        yield first
+        async for row in rows:
+            yield row
+    finally:
+        await rows.aclose()
+
+
+async def ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+    try:
+        async for row in rows:
+            chunk += orjson.dumps(row, default=default)
+            chunk += b"\n"
+            if len(chunk) >= CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+    finally:
+        # closing releases the source cursor when the client goes away
+        await rows.aclose()
+
+
+async def collect(rows: AsyncIterator[dict]) -> List[dict]:
+    """
+    Reads the rows into memory, up to EXECUTOR_MAX_ROWS of them
+    """
+    collected = []
+    try:
+        async for row in rows:
+            if len(collected) == settings.EXECUTOR_MAX_ROWS:
+                raise CustomException(
+                    400,
+                    ERR_BAD_REQUEST,
+                    f"Query returned more than {settings.EXECUTOR_MAX_ROWS} rows, "
+                    "stream it instead",
+                )
+            collected.append(row)
+    finally:
+        await rows.aclose()
+    return collected
+
+
+def require_pyarrow():
+    """
+    pyarrow is an optional dependency, installed with the arrow extra
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise CustomException(
+            406, ERR_BAD_REQUEST, "Arrow output is not available on this server"
+        )
+
+
+PLAIN_TYPES = (str, int, float, bool, datetime, type(None))
+
+
+def plain(value):
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    # ObjectId, Decimal128 and the like are written as they are in JSON
+    return default(value)
+
+
+class ArrowSink:
+    """
+    File-like buffer the Arrow stream writer writes into, drained after
+    every record batch
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def column(rows: List[dict], name: str) -> list:
+    values = [row.get(name) for row in rows]
+    # most columns only hold plain values, they are kept as they are
+    if set(map(type, values)) <= set(PLAIN_TYPES):
+        return values
+    return [plain(value) for value in values]
+
+
+def arrow_batch(rows: List[dict], schema=None):
+    """
+    Converts the rows to a table. Without a schema its columns are the keys
+    of every row and their types are inferred from all their values, with
+    one the rows are made to fit it
+    """
+    import pyarrow as pa
+
+    if schema is None:
+        columns = {key: None for row in rows for key in row}
+        return pa.table({name: pa.array(column(rows, name)) for name in columns})
+    unknown = {key for row in rows for key in row} - set(schema.names)
+    if unknown:
+        raise pa.ArrowInvalid(f"columns {sorted(unknown)} are not in the schema")
+    return pa.table(
+        {
+            # a safe cast, 2.5 would be truncated when converted to an int
+            name: pa.array(column(rows, name)).cast(type)
+            for name, type in zip(schema.names, schema.types)
+        },
+        schema=schema,
+    )
+
+
+async def arrow_batches(rows: AsyncIterator[dict]) -> AsyncIterator[List[dict]]:
+    batch: List[dict] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= settings.EXECUTOR_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def arrow(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """
+    Converts the first batch of rows before the response starts, so errors
+    still get their status code, and returns the Arrow IPC stream writing
+    every batch as it is read. An Arrow stream has a single schema, the one
+    of the first batch, the later batches must fit it
+    """
+    import pyarrow as pa
+
+    batches = arrow_batches(rows)
+    try:
+        first = arrow_batch(await anext(batches, []))
+    except pa.ArrowException as e:
+        await rows.aclose()
+        raise CustomException(
+            502, ERR_QUERY_EXECUTION, f"Query rows do not fit an Arrow schema: {e}"
+        )
+    except BaseException:
+        await rows.aclose()
+        raise
+    return arrow_stream(first, batches, rows)
+
+
+async def arrow_stream(first, batches: AsyncIterator[List[dict]], rows: AsyncIterator):
+    import pyarrow as pa
+
+    sink = ArrowSink()
+    writer = pa.ipc.new_stream(sink, first.schema)
+    try:
+        writer.write_table(first)
+        yield sink.drain()
+        async for batch in batches:
+            try:
+                table = arrow_batch(batch, first.schema)
+            except pa.ArrowException as e:
+                # the response already started, the stream is cut short
+                logger.warning("Query rows do not fit the Arrow schema: %s", e)
+                raise
+            writer.write_table(table)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+    finally:
+        await rows.aclose()
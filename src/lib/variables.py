@@ -0,0 +1,40 @@
+import re
+from typing import Any, List
+
+VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def resolve(value: Any, variables: dict) -> Any:
+    """
+    Replaces the {{name}} placeholders in the strings of `value`. A string
+    that is just a placeholder takes the variable as is, keeping its type,
+    unknown variables are left untouched
+    """
+    if isinstance(value, dict):
+        return {key: resolve(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, variables) for item in value]
+    if not isinstance(value, str):
+        return value
+    match = VARIABLE.fullmatch(value.strip())
+    if match and match.group(1) in variables:
+        return variables[match.group(1)]
+    return VARIABLE.sub(
+        lambda match: str(variables.get(match.group(1), match.group(0))), value
+    )
+
+
+def referenced(value: Any) -> List[str]:
+    """
+    Names of the variables the placeholders in `value` refer to, in the
+    order they first appear
+    """
+    if isinstance(value, dict):
+        names = [name for item in value.values() for name in referenced(item)]
+    elif isinstance(value, list):
+        names = [name for item in value for name in referenced(item)]
+    elif isinstance(value, str):
+        names = VARIABLE.findall(value)
+    else:
+        names = []
+    return list(dict.fromkeys(names))
@@ -5,26 +5,56 @@ from routers.dashboards import DashboardsRouter
 from routers.folders import FoldersRouter
 from routers.connections import ConnectionsRouter
 from routers.queries import QueriesRouter
+from routers.metrics import MetricsRouter
 from configs.database import mongodb
+from repositories.cache import invalidator
+from executors.registry import close_executors, start_executors
+from migrations.openai_api_key_preview import backfill_openai_api_key_preview
+from migrations.published_bundle_credentials import strip_published_bundle_credentials
+from migrations.published_bundle_metadata import strip_published_bundle_metadata
+from migrations.connection_credentials import encrypt_connection_credentials
+from migrations.published_dashboard_version import backfill_published_dashboard_version
 from contextlib import asynccontextmanager
 from fastapi.exceptions import RequestValidationError
 from errors import CustomException, handle_validation_error, handle_custom_exception
+from lib.loader import LoaderMiddleware
+from lib.log import RequestLoggingMiddleware, configure_logging, logger
+from lib.metrics import MetricsMiddleware
+from lib.responses import MongoJSONResponse
+
+
+log_listener = configure_logging()
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    print("Starting MongoDB connection")
+    log_listener.start()
+    logger.info("Starting MongoDB connection")
     await mongodb.connect()
+    await backfill_openai_api_key_preview()
+    await strip_published_bundle_credentials()
+    await strip_published_bundle_metadata()
+    await encrypt_connection_credentials()
+    await backfill_published_dashboard_version()
+    invalidator.start(mongodb.database)
+    start_executors()
     yield
-    print("Closing MongoDB connection")
+    await invalidator.stop()
+    await close_executors()
+    logger.info("Closing MongoDB connection")
     await mongodb.disconnect()
+    log_listener.stop()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=MongoJSONResponse)
+app.add_middleware(LoaderMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
 app.include_router(DashboardsRouter)
 app.include_router(FoldersRouter)
 app.include_router(ConnectionsRouter)
 app.include_router(QueriesRouter)
+app.include_router(MetricsRouter)
 app.add_exception_handler(RequestValidationError, handle_validation_error)
 app.add_exception_handler(CustomException, handle_custom_exception)
 
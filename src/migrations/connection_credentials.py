@@ -0,0 +1,92 @@
+from pymongo import UpdateOne
+from models.connection import Connection
+from lib.encryption import (
+    OPENAI_API_KEY,
+    PLAIN_CREDENTIALS,
+    SEALED_PREFIX,
+    seal_credentials,
+)
+
+BATCH_SIZE = 500
+
+
+def unsealed_filter() -> dict:
+    """
+    Matches the connections holding a credential stored before they were
+    encrypted, the ones already sealed are never read again
+    """
+    credentials = {
+        "$cond": [
+            {"$eq": [{"$type": "$credentials"}, "object"]},
+            {"$objectToArray": "$credentials"},
+            [],
+        ]
+    }
+    unsealed = {
+        "$and": [
+            {
+                "$not": [
+                    {
+                        "$in": [
+                            "$$credential.k",
+                            [*sorted(PLAIN_CREDENTIALS), OPENAI_API_KEY],
+                        ]
+                    }
+                ]
+            },
+            {
+                "$not": [
+                    {
+                        "$and": [
+                            {"$eq": [{"$type": "$$credential.v"}, "string"]},
+                            {
+                                "$eq": [
+                                    {"$indexOfCP": ["$$credential.v", SEALED_PREFIX]},
+                                    0,
+                                ]
+                            },
+                        ]
+                    }
+                ]
+            },
+        ]
+    }
+    return {
+        "$expr": {
+            "$gt": [
+                {
+                    "$size": {
+                        "$filter": {
+                            "input": credentials,
+                            "as": "credential",
+                            "cond": unsealed,
+                        }
+                    }
+                },
+                0,
+            ]
+        }
+    }
+
+
+async def encrypt_connection_credentials():
+    """
+    Encrypts the credentials of connections stored before they were sealed
+    """
+    collection = Connection.get_motor_collection()
+    cursor = collection.find(unsealed_filter(), {"credentials": 1})
+    updates = []
+    async for connection in cursor:
+        credentials = connection["credentials"]
+        updates.append(
+            UpdateOne(
+                # skipped when the credentials were edited in the meantime
+                {"_id": connection["_id"], "credentials": credentials},
+                {"$set": {"credentials": seal_credentials(credentials)}},
+            )
+        )
+        if len(updates) == BATCH_SIZE:
+            await collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
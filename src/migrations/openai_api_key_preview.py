@@ -0,0 +1,44 @@
+from cryptography.fernet import InvalidToken
+from pymongo import UpdateOne
+from models.connection import Connection
+from lib.encryption import decrypt, preview
+from lib.log import logger
+
+BATCH_SIZE = 500
+
+
+async def backfill_openai_api_key_preview():
+    """
+    Stores the api key preview of connections created before it was computed
+    at write time, so reads never have to decrypt the key
+    """
+    collection = Connection.get_motor_collection()
+    cursor = collection.find(
+        {
+            "credentials.openai_api_key": {"$exists": True},
+            "credentials.openai_api_key_preview": {"$exists": False},
+        },
+        {"credentials.openai_api_key": 1},
+    )
+    updates = []
+    async for connection in cursor:
+        try:
+            api_key = decrypt(connection["credentials"]["openai_api_key"])
+        except (InvalidToken, TypeError, AttributeError):
+            # encrypted with a key that is no longer configured, or not a
+            # token at all, the connection is left without a preview
+            logger.warning(
+                "Could not decrypt the api key of connection %s", connection["_id"]
+            )
+            continue
+        updates.append(
+            UpdateOne(
+                {"_id": connection["_id"]},
+                {"$set": {"credentials.openai_api_key_preview": preview(api_key)}},
+            )
+        )
+        if len(updates) == BATCH_SIZE:
+            await collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
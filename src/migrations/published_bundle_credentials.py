@@ -0,0 +1,12 @@
+from models.dashboard import PublishedDashboard
+
+
+async def strip_published_bundle_credentials():
+    """
+    Bundles published before the credentials were left out of them kept a
+    redacted copy, which could still hold secrets under unexpected keys
+    """
+    await PublishedDashboard.get_motor_collection().update_many(
+        {"queries.connection.credentials": {"$exists": True}},
+        {"$unset": {"queries.$[].connection.credentials": ""}},
+    )
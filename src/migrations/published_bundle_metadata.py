@@ -0,0 +1,19 @@
+from lib.variables import referenced
+from models.dashboard import PublishedDashboard
+
+
+async def strip_published_bundle_metadata():
+    """
+    Bundles published before the queries' definitions were left out of
+    them still hold their headers, bodies and statements
+    """
+    collection = PublishedDashboard.get_motor_collection()
+    cursor = collection.find({"queries.metadata": {"$exists": True}}, {"queries": 1})
+    async for published in cursor:
+        queries = []
+        for query in published["queries"]:
+            metadata = query.pop("metadata", None)
+            queries.append({**query, "variables": referenced(metadata)})
+        await collection.update_one(
+            {"_id": published["_id"]}, {"$set": {"queries": queries}}
+        )
@@ -0,0 +1,13 @@
+from beanie import PydanticObjectId as ObjectId
+from models.dashboard import PublishedDashboard
+
+
+async def backfill_published_dashboard_version():
+    """
+    Dashboards published before they had a version were given a new one on
+    every read, so each worker served them with a different ETag
+    """
+    # one version for all of them is enough, an ETag is compared per dashboard
+    await PublishedDashboard.get_motor_collection().update_many(
+        {"version": {"$exists": False}}, {"$set": {"version": ObjectId()}}
+    )
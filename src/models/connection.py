@@ -1,5 +1,6 @@
 from beanie import Document
 from enum import Enum
+from pymongo import ASCENDING, IndexModel
 
 
 class ConnectionType(str, Enum):
@@ -17,3 +18,9 @@ class Connection(Document):
 
     class Settings:
         collection = "connections"
+        # lists are sorted by _id to paginate, it trails the filtered keys
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("type", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        ]
@@ -1,7 +1,8 @@
 from beanie import Document, Indexed
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 from beanie import PydanticObjectId as ObjectId
+from pymongo import ASCENDING, IndexModel
 
 
 class Dashboard(Document):
@@ -12,12 +13,24 @@ class Dashboard(Document):
 
     class Settings:
         collection = "dashboards"
-        indexes = ["folder_id"]
+        # lists are sorted by _id to paginate, it trails the filtered keys
+        indexes = [
+            IndexModel([("folder_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel(
+                [("user_id", ASCENDING), ("folder_id", ASCENDING), ("_id", ASCENDING)]
+            ),
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        ]
 
 
 class PublishedDashboard(Document):
     dashboard_id: Indexed(ObjectId, unique=True)
     dashboard: Dashboard
+    version: ObjectId = Field(default_factory=ObjectId)
+    # queries used by the widgets, resolved when publishing so the bundle is
+    # served with a single read
+    queries: List[dict] = Field(default_factory=list)
 
     class Settings:
         collection = "published_dashboards"
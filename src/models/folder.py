@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import ASCENDING, IndexModel
 
 
 class Folder(Document):
@@ -7,3 +8,8 @@ class Folder(Document):
 
     class Settings:
         collection = "folders"
+        # lists are sorted by _id to paginate, it trails the filtered keys
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        ]
@@ -1,6 +1,7 @@
 from beanie import Document
 from beanie import PydanticObjectId as ObjectId
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 
 class Query(Document):
@@ -11,4 +12,15 @@ class Query(Document):
 
     class Settings:
         collection = "queries"
-        indexes = ["connection_id"]
+        # lists are sorted by _id to paginate, it trails the filtered keys
+        indexes = [
+            IndexModel([("connection_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("connection_id", ASCENDING),
+                    ("_id", ASCENDING),
+                ]
+            ),
+        ]
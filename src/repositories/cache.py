@@ -0,0 +1,151 @@
+import asyncio
+from typing import Optional
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from configs.settings import settings
+from lib.cache import LRUCache
+from lib.loader import clear_loaders
+from lib.log import logger
+from models.connection import Connection
+from models.dashboard import Dashboard, PublishedDashboard
+from models.query import Query
+from repositories.pipelines import collection_name
+
+published_dashboards_cache = LRUCache(
+    settings.PUBLISHED_CACHE_MAX_SIZE, settings.PUBLISHED_CACHE_TTL
+)
+# only safe while a change stream tells us about writes from other workers,
+# the invalidator enables them once it is watching
+dashboards_cache = LRUCache(
+    settings.REPOSITORY_CACHE_MAX_SIZE, settings.REPOSITORY_CACHE_TTL, enabled=False
+)
+connections_cache = LRUCache(
+    settings.REPOSITORY_CACHE_MAX_SIZE, settings.REPOSITORY_CACHE_TTL, enabled=False
+)
+queries_cache = LRUCache(
+    settings.REPOSITORY_CACHE_MAX_SIZE, settings.REPOSITORY_CACHE_TTL, enabled=False
+)
+
+
+def evict_published_dashboard(published_id: ObjectId):
+    published_dashboards_cache.invalidate_where(
+        lambda published_dashboard: published_dashboard.id == published_id
+    )
+
+
+# the evictions also forget what the current request loaded, a folder or
+# connection it loaded embeds the dashboards and queries written after it
+
+
+def evict_dashboard(dashboard_id: ObjectId):
+    dashboards_cache.invalidate(dashboard_id)
+    clear_loaders()
+
+
+def evict_dashboards():
+    dashboards_cache.clear()
+    clear_loaders()
+
+
+def evict_folder(folder_id: ObjectId):
+    clear_loaders()
+
+
+def evict_connection(connection_id: ObjectId):
+    connections_cache.invalidate(connection_id)
+    queries_cache.invalidate_where(lambda query: query.connection_id == connection_id)
+    clear_loaders()
+
+
+def evict_query(query_id: ObjectId, connection_id: Optional[ObjectId] = None):
+    queries_cache.invalidate(query_id)
+    if connection_id:
+        connections_cache.invalidate(connection_id)
+    connections_cache.invalidate_where(
+        lambda connection: any(query.id == query_id for query in connection.queries)
+    )
+    clear_loaders()
+
+
+def evict_queries():
+    queries_cache.clear()
+    connections_cache.clear()
+    clear_loaders()
+
+
+class CacheInvalidator:
+    """
+    Tails a change stream on the cached collections and evicts the entries
+    written by any worker, resuming from the last seen token after errors
+    """
+
+    def __init__(self):
+        self.resume_token = None
+        self._task = None
+
+    def start(self, database: AsyncIOMotorDatabase):
+        self._task = asyncio.create_task(self._watch(database))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._set_enabled(False)
+
+    def _set_enabled(self, enabled: bool):
+        for cache in (dashboards_cache, connections_cache, queries_cache):
+            cache.enabled = enabled
+            cache.clear()
+
+    async def _watch(self, database: AsyncIOMotorDatabase):
+        collections = [
+            collection_name(model)
+            for model in (PublishedDashboard, Dashboard, Connection, Query)
+        ]
+        pipeline = [{"$match": {"ns.coll": {"$in": collections}}}]
+        while True:
+            try:
+                async with database.watch(
+                    pipeline, resume_after=self.resume_token
+                ) as stream:
+                    if not dashboards_cache.enabled:
+                        self._set_enabled(True)
+                    while stream.alive:
+                        change = await stream.try_next()
+                        self.resume_token = stream.resume_token
+                        if change:
+                            self.evict(change)
+            except ConnectionFailure as e:
+                logger.warning("Cache invalidation stream interrupted: %s", e)
+            except Exception as e:
+                # the stream can not be resumed (or is not supported by the
+                # server), we may have missed writes so stop caching
+                logger.warning("Cache invalidation stream failed: %s", e)
+                self.resume_token = None
+                self._set_enabled(False)
+            await asyncio.sleep(settings.CACHE_WATCH_RETRY_SECONDS)
+
+    def evict(self, change: dict):
+        if "documentKey" not in change:
+            # drops and renames do not point to a single document
+            published_dashboards_cache.clear()
+            self._set_enabled(dashboards_cache.enabled)
+            return
+        collection = change["ns"]["coll"]
+        document_id = change["documentKey"]["_id"]
+        if collection == collection_name(PublishedDashboard):
+            evict_published_dashboard(document_id)
+        elif collection == collection_name(Dashboard):
+            evict_dashboard(document_id)
+        elif collection == collection_name(Connection):
+            evict_connection(document_id)
+        elif collection == collection_name(Query):
+            document = change.get("fullDocument") or {}
+            evict_query(document_id, document.get("connection_id"))
+
+
+invalidator = CacheInvalidator()
@@ -1,58 +1,138 @@
 from models.connection import Connection
+from models.query import Query
+from repositories.pipelines import lookup, match, paginate, project
+from repositories.cache import connections_cache, evict_connection
 from errors import CustomException, ERR_INTERNAL
 from beanie import PydanticObjectId as ObjectId
-from typing import Optional, List
+from typing import Any, Optional, List, Set
+from lib.encryption import open_credentials, seal_credentials
 from schemas.connection import (
     ConnectionUpdate,
 )
-from schemas.connection import ConnectionResponse
-from motor.motor_asyncio import AsyncIOMotorClient as Session
+from schemas.connection import ConnectionPartialResponse, ConnectionResponse
+from repositories.session import Repository
 
 
-class ConnectionRepository:
-    session: Session = None
+def queries_lookup() -> dict:
+    return lookup(
+        Query,
+        "_id",
+        "connection_id",
+        "queries",
+        projection={"name": 1, "user_id": 1, "connection_id": 1, "metadata": 1},
+    )
 
+
+def projected_stages(fields: Optional[Set[str]], *required: str) -> List[dict]:
+    """
+    Stages applied after matching the connections, only joining the queries
+    when they were requested
+    """
+    if not fields:
+        return [queries_lookup()]
+    stages = [project(fields, *required)]
+    if "queries" in fields:
+        stages.append(queries_lookup())
+    return stages
+
+
+def opened(connection: Any) -> Any:
+    """
+    Decrypts the stored credentials of a connection, a model or a plain dict
+    """
+    if isinstance(connection, dict):
+        if connection.get("credentials"):
+            connection["credentials"] = open_credentials(connection["credentials"])
+    elif connection is not None and connection.credentials:
+        connection.credentials = open_credentials(connection.credentials)
+    return connection
+
+
+class ConnectionRepository(Repository):
     async def create(self, connection: Connection) -> Connection:
         try:
+            credentials = connection.credentials
+            connection.credentials = seal_credentials(credentials)
             await connection.insert(session=self.session)
+            connection.credentials = credentials
             return connection
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error creating connection: {str(e)}"
             )
 
-    async def get_by_id(self, connection_id: ObjectId) -> Optional[ConnectionResponse]:
+    async def get_by_id(
+        self, connection_id: ObjectId, fields: Optional[Set[str]] = None
+    ) -> Optional[ConnectionResponse]:
+        loader = None if fields else self.loader("connection", self.get_by_ids)
+        if loader:
+            return await loader.load(connection_id)
         try:
+            # reads inside a transaction must see its own writes and projected
+            # reads only hold some fields, both skip the cache
+            cached = not self.session and not fields
+            connection = connections_cache.get(connection_id) if cached else None
+            if connection:
+                return connection
+            generation = connections_cache.generation
             pipeline = [
-                {
-                    "$lookup": {
-                        "from": "Query",
-                        "localField": "_id",
-                        "foreignField": "connection_id",
-                        "as": "queries",
-                    }
-                },
                 {"$match": {"_id": connection_id}},
+                *projected_stages(fields, "user_id"),
             ]
             connections = await Connection.aggregate(
-                pipeline, projection_model=ConnectionResponse, session=self.session
+                pipeline,
+                projection_model=(
+                    ConnectionPartialResponse if fields else ConnectionResponse
+                ),
+                session=self.session,
             ).to_list()
+            for connection in connections:
+                opened(connection)
+            if connections and cached:
+                connections_cache.set(connection_id, connections[0], generation)
             return connections[0] if connections else None
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error fetching connection: {str(e)}"
             )
 
+    async def get_by_ids(
+        self, connection_ids: List[ObjectId]
+    ) -> List[ConnectionResponse]:
+        try:
+            cached = [] if self.session else connections_cache.get_many(connection_ids)
+            missing = list(set(connection_ids) - {connection.id for connection in cached})
+            if not missing:
+                return cached
+            generation = connections_cache.generation
+            pipeline = [{"$match": {"_id": {"$in": missing}}}, queries_lookup()]
+            connections = await Connection.aggregate(
+                pipeline, projection_model=ConnectionResponse, session=self.session
+            ).to_list()
+            for connection in connections:
+                opened(connection)
+            if not self.session:
+                for connection in connections:
+                    connections_cache.set(connection.id, connection, generation)
+            return cached + connections
+        except Exception as e:
+            raise CustomException(
+                500, ERR_INTERNAL, f"Error fetching connections: {str(e)}"
+            )
+
     async def update(
         self, connection_id: ObjectId, connection_query: ConnectionUpdate
     ) -> Optional[Connection]:
         try:
-            connection = await Connection.get(connection_id, session=self.session)
-            data = {}
-            for attr in connection_query.model_fields_set:
-                data[attr] = getattr(connection_query, attr)
-            await connection.update({"$set": data}, session=self.session)
-            return connection
+            if connection_query.credentials is not None:
+                connection_query = connection_query.model_copy(
+                    update={"credentials": seal_credentials(connection_query.credentials)}
+                )
+            connection = await self.update_owned(
+                Connection, connection_id, connection_query
+            )
+            evict_connection(connection_id)
+            return opened(connection)
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error updating connection: {str(e)}"
@@ -62,34 +142,31 @@ class ConnectionRepository:
         try:
             connection = await Connection.get(connection_id, session=self.session)
             res = await connection.delete(session=self.session)
+            evict_connection(connection_id)
             return res.deleted_count > 0
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error deleting connection: {str(e)}"
             )
 
-    async def get(self, filters: List) -> List[Connection]:
+    async def get(
+        self,
+        filters: List,
+        limit: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> List[dict]:
+        """
+        Reads plain dicts for the list endpoints, skipping the models
+        """
         try:
-            match_stage = {"$match": {}}
-            for filter in filters:
-                match_stage["$match"][filter["name"]] = {
-                    filter["operator"]: filter["value"]
-                }
-            pipeline = [
-                match_stage,
-                {
-                    "$lookup": {
-                        "from": "Query",
-                        "localField": "_id",
-                        "foreignField": "connection_id",
-                        "as": "queries",
-                    }
-                },
-            ]
-            connections = await Connection.aggregate(
-                pipeline, projection_model=ConnectionResponse, session=self.session
-            ).to_list()
-            return connections
+            fields = fields or set(ConnectionPartialResponse.model_fields)
+            pipeline = [match(filters), *paginate(limit), *projected_stages(fields)]
+            connections = await (
+                self.stale_collection(Connection)
+                .aggregate(pipeline, session=self.session)
+                .to_list(None)
+            )
+            return [opened(connection) for connection in connections]
 
         except Exception as e:
             raise CustomException(
@@ -1,39 +1,51 @@
 from models.dashboard import Dashboard, PublishedDashboard
-from typing import List, Optional
+from repositories.pipelines import build_query, match, paginate, project
+from typing import List, Optional, Set
 from bson import ObjectId
 from schemas.dashboard import (
+    DashboardPartialResponse,
     DashboardUpdate,
 )
 from errors import CustomException, ERR_INTERNAL
-from motor.motor_asyncio import AsyncIOMotorClient as Session
-
+from repositories.session import Repository
+from repositories.cache import (
+    dashboards_cache,
+    evict_dashboard,
+    evict_dashboards,
+    published_dashboards_cache,
+)
 
-class DashboardRepository:
-    session: Session = None
 
+class DashboardRepository(Repository):
     async def create(self, dashboard: Dashboard) -> Dashboard:
         try:
             await dashboard.insert(session=self.session)
+            evict_dashboard(dashboard.id)
             return dashboard
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error creating dashboard: {str(e)}"
             )
 
-    async def publish(self, dashboard_id, dashboard) -> Dashboard:
+    async def publish(
+        self, dashboard_id, dashboard, queries: Optional[List[dict]] = None
+    ) -> Dashboard:
         try:
             published_dashboard = await PublishedDashboard.find_one(
                 {"dashboard_id": dashboard_id}, session=self.session
             )
             if not published_dashboard:
                 published_dashboard = PublishedDashboard(
-                    dashboard_id=dashboard_id, dashboard=dashboard
+                    dashboard_id=dashboard_id, dashboard=dashboard, queries=queries or []
                 )
             else:
                 published_dashboard.dashboard_id = dashboard_id
                 published_dashboard.dashboard = dashboard
+                published_dashboard.queries = queries or []
+                published_dashboard.version = ObjectId()
 
             await published_dashboard.save(session=self.session)
+            published_dashboards_cache.invalidate(dashboard_id)
 
             return published_dashboard
         except Exception as e:
@@ -48,6 +60,7 @@ class DashboardRepository:
             )
             if published_dashboard:
                 await published_dashboard.delete(session=self.session)
+                published_dashboards_cache.invalidate(dashboard_id)
                 return True
             return False
         except Exception as e:
@@ -57,34 +70,79 @@ class DashboardRepository:
 
     async def get_published(self, dashboard_id: ObjectId) -> Optional[PublishedDashboard]:
         try:
-            published_dashboard = await PublishedDashboard.find_one(
-                {"dashboard_id": dashboard_id}, session=self.session
-            )
-            return published_dashboard.dashboard if published_dashboard else None
+            # reads inside a transaction must see its own writes, skip the cache
+            if self.session:
+                return await PublishedDashboard.find_one(
+                    {"dashboard_id": dashboard_id}, session=self.session
+                )
+            published_dashboard = published_dashboards_cache.get(dashboard_id)
+            if not published_dashboard:
+                generation = published_dashboards_cache.generation
+                document = await self.stale_collection(PublishedDashboard).find_one(
+                    {"dashboard_id": dashboard_id}
+                )
+                if document:
+                    published_dashboard = PublishedDashboard.model_validate(document)
+                    published_dashboards_cache.set(
+                        dashboard_id, published_dashboard, generation
+                    )
+            return published_dashboard
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error fetching published dashboard: {str(e)}"
             )
 
-    async def get_by_id(self, dashboard_id: ObjectId) -> Optional[Dashboard]:
+    async def get_by_id(
+        self, dashboard_id: ObjectId, fields: Optional[Set[str]] = None
+    ) -> Optional[Dashboard]:
         try:
+            if fields:
+                pipeline = [{"$match": {"_id": dashboard_id}}, project(fields, "user_id")]
+                dashboards = await Dashboard.aggregate(
+                    pipeline,
+                    projection_model=DashboardPartialResponse,
+                    session=self.session,
+                ).to_list()
+                return dashboards[0] if dashboards else None
+            # reads inside a transaction must see its own writes, skip the cache
+            dashboard = None if self.session else dashboards_cache.get(dashboard_id)
+            if dashboard:
+                return dashboard
+            generation = dashboards_cache.generation
             dashboard = await Dashboard.get(dashboard_id, session=self.session)
+            if dashboard and not self.session:
+                dashboards_cache.set(dashboard_id, dashboard, generation)
             return dashboard
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error fetching dashboard: {str(e)}"
             )
 
+    async def get_by_ids(self, dashboard_ids: List[ObjectId]) -> List[Dashboard]:
+        try:
+            cached = [] if self.session else dashboards_cache.get_many(dashboard_ids)
+            missing = list(set(dashboard_ids) - {dashboard.id for dashboard in cached})
+            if not missing:
+                return cached
+            generation = dashboards_cache.generation
+            dashboards = await Dashboard.find(
+                {"_id": {"$in": missing}}, session=self.session
+            ).to_list()
+            if not self.session:
+                for dashboard in dashboards:
+                    dashboards_cache.set(dashboard.id, dashboard, generation)
+            return cached + dashboards
+        except Exception as e:
+            raise CustomException(
+                500, ERR_INTERNAL, f"Error fetching dashboards: {str(e)}"
+            )
+
     async def update(
         self, dashboard_id: ObjectId, dashboard_query: DashboardUpdate
     ) -> Optional[Dashboard]:
         try:
-            dashboard = await Dashboard.get(dashboard_id, session=self.session)
-            data = {}
-            for attr in dashboard_query.model_fields_set:
-                data[attr] = getattr(dashboard_query, attr)
-
-            await dashboard.update({"$set": data}, session=self.session)
+            dashboard = await self.update_owned(Dashboard, dashboard_id, dashboard_query)
+            evict_dashboard(dashboard_id)
             return dashboard
         except Exception as e:
             raise CustomException(
@@ -95,20 +153,42 @@ class DashboardRepository:
         try:
             dashboard = await Dashboard.get(dashboard_id, session=self.session)
             res = await dashboard.delete(session=self.session)
+            evict_dashboard(dashboard_id)
             return res.deleted_count > 0
         except Exception as e:
             raise CustomException(
                 500, ERR_INTERNAL, f"Error deleting dashboard: {str(e)}"
             )
 
-    async def get(self, filters: List) -> List[Dashboard]:
+    async def update_many(self, filters: List, values: dict) -> int:
         try:
-            dashboards_query = Dashboard.find(session=self.session)
-            for filter in filters:
-                dashboards_query.find(
-                    {filter["name"]: {filter["operator"]: filter["value"]}}
-                )
-            return await dashboards_query.to_list()
+            res = await Dashboard.find(build_query(filters), session=self.session).update(
+                {"$set": values}, session=self.session
+            )
+            evict_dashboards()
+            return res.modified_count
+        except Exception as e:
+            raise CustomException(
+                500, ERR_INTERNAL, f"Error updating dashboards: {str(e)}"
+            )
+
+    async def get(
+        self,
+        filters: List,
+        limit: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> List[dict]:
+        """
+        Reads plain dicts for the list endpoints, skipping the models
+        """
+        try:
+            fields = fields or set(DashboardPartialResponse.model_fields)
+            pipeline = [match(filters), *paginate(limit), project(fields)]
+            return await (
+                self.stale_collection(Dashboard)
+                .aggregate(pipeline, session=self.session)
+                .to_list(None)
+            )
 
         except Exception as e:
             raise CustomException(
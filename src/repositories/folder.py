@@ -1,15 +1,45 @@
 from models.folder import Folder
-from typing import List, Optional
+from models.dashboard import Dashboard
+from repositories.pipelines import lookup, match, paginate, project
+from typing import List, Optional, Set
 from bson import ObjectId
 from schemas.folder import FolderUpdate
 from errors import CustomException, ERR_INTERNAL
-from schemas.folder import FolderResponse
-from motor.motor_asyncio import AsyncIOMotorClient as Session
+from schemas.folder import FolderPartialResponse, FolderResponse
+from repositories.session import Repository
+from repositories.cache import evict_folder
 
 
-class FolderRepository:
-    session: Session = None
+def dashboards_lookup(limit: Optional[int] = None) -> dict:
+    """
+    Embeds a summary of each folder's dashboards, leaving out their metadata
+    """
+    return lookup(
+        Dashboard,
+        "_id",
+        "folder_id",
+        "dashboards",
+        projection={"name": 1, "folder_id": 1},
+        limit=limit,
+    )
 
+
+def projected_stages(
+    fields: Optional[Set[str]], *required: str, dashboards_limit: Optional[int] = None
+) -> List[dict]:
+    """
+    Stages applied after matching the folders, only joining the dashboards
+    when they were requested
+    """
+    if not fields:
+        return [dashboards_lookup(dashboards_limit)]
+    stages = [project(fields, *required)]
+    if "dashboards" in fields:
+        stages.append(dashboards_lookup(dashboards_limit))
+    return stages
+
+
+class FolderRepository(Repository):
     async def create(self, folder: Folder) -> Folder:
         try:
             await folder.insert(session=self.session)
@@ -21,21 +51,21 @@ class FolderRepository:
                 f"Error creating folder: {str(e)}",
             )
 
-    async def get_by_id(self, folder_id: ObjectId) -> Optional[FolderResponse]:
+    async def get_by_id(
+        self, folder_id: ObjectId, fields: Optional[Set[str]] = None
+    ) -> Optional[FolderResponse]:
+        loader = None if fields else self.loader("folder", self.get_by_ids)
+        if loader:
+            return await loader.load(folder_id)
         try:
             pipeline = [
-                {
-                    "$lookup": {
-                        "from": "Dashboard",
-                        "localField": "_id",
-                        "foreignField": "folder_id",
-                        "as": "dashboards",
-                    }
-                },
                 {"$match": {"_id": folder_id}},
+                *projected_stages(fields, "user_id"),
             ]
             folders = await Folder.aggregate(
-                pipeline, projection_model=FolderResponse, session=self.session
+                pipeline,
+                projection_model=FolderPartialResponse if fields else FolderResponse,
+                session=self.session,
             ).to_list()
             return folders[0] if folders else None
         except Exception as e:
@@ -45,15 +75,25 @@ class FolderRepository:
                 f"Error fetching folder: {str(e)}",
             )
 
+    async def get_by_ids(self, folder_ids: List[ObjectId]) -> List[FolderResponse]:
+        try:
+            pipeline = [{"$match": {"_id": {"$in": folder_ids}}}, dashboards_lookup()]
+            return await Folder.aggregate(
+                pipeline, projection_model=FolderResponse, session=self.session
+            ).to_list()
+        except Exception as e:
+            raise CustomException(
+                500,
+                ERR_INTERNAL,
+                f"Error fetching folders: {str(e)}",
+            )
+
     async def update(
         self, folder_id: ObjectId, folder_query: FolderUpdate
     ) -> Optional[Folder]:
         try:
-            folder = await Folder.get(folder_id, session=self.session)
-            data = {}
-            for attr in folder_query.model_fields_set:
-                data[attr] = getattr(folder_query, attr)
-            await folder.update({"$set": data}, session=self.session)
+            folder = await self.update_owned(Folder, folder_id, folder_query)
+            evict_folder(folder_id)
             return folder
         except Exception as e:
             raise CustomException(
@@ -66,6 +106,7 @@ class FolderRepository:
         try:
             folder = await Folder.get(folder_id, session=self.session)
             res = await folder.delete(session=self.session)
+            evict_folder(folder_id)
             return res.deleted_count > 0
         except Exception as e:
             raise CustomException(
@@ -74,28 +115,28 @@ class FolderRepository:
                 f"Error deleting folder: {str(e)}",
             )
 
-    async def get(self, filters: List) -> List[Folder]:
+    async def get(
+        self,
+        filters: List,
+        limit: Optional[int] = None,
+        dashboards_limit: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> List[dict]:
+        """
+        Reads plain dicts for the list endpoints, skipping the models
+        """
         try:
-            match_stage = {"$match": {}}
-            for filter in filters:
-                match_stage["$match"][filter["name"]] = {
-                    filter["operator"]: filter["value"]
-                }
+            fields = fields or set(FolderPartialResponse.model_fields)
             pipeline = [
-                {
-                    "$lookup": {
-                        "from": "Dashboard",
-                        "localField": "_id",
-                        "foreignField": "folder_id",
-                        "as": "dashboards",
-                    }
-                },
-                match_stage,
+                match(filters),
+                *paginate(limit),
+                *projected_stages(fields, dashboards_limit=dashboards_limit),
             ]
-            folders = await Folder.aggregate(
-                pipeline, projection_model=FolderResponse, session=self.session
-            ).to_list()
-            return folders
+            return await (
+                self.stale_collection(Folder)
+                .aggregate(pipeline, session=self.session)
+                .to_list(None)
+            )
         except Exception as e:
             raise CustomException(
                 500,
@@ -0,0 +1,79 @@
+from beanie import Document
+from typing import List, Optional, Set, Type
+
+
+def collection_name(model: Type[Document]) -> str:
+    """
+    Beanie reads the collection name from Settings.name and defaults to the
+    class name, the models' Settings.collection is ignored
+    """
+    return model.get_collection_name()
+
+
+def build_query(filters: List) -> dict:
+    query = {}
+    for filter in filters:
+        query[filter["name"]] = {filter["operator"]: filter["value"]}
+    return query
+
+
+def match(filters: List) -> dict:
+    return {"$match": build_query(filters)}
+
+
+def paginate(limit: Optional[int] = None) -> List[dict]:
+    stages = [{"$sort": {"_id": 1}}]
+    if limit:
+        stages.append({"$limit": limit})
+    return stages
+
+
+def project(fields: Set[str], *required: str) -> dict:
+    """
+    Keeps only `fields` (plus `required`) of each document, `_id` is always kept
+    """
+    return {"$project": {field: 1 for field in {*fields, *required} if field != "id"}}
+
+
+def lookup(
+    model: Type[Document],
+    local_field: str,
+    foreign_field: str,
+    as_field: str,
+    projection: Optional[dict] = None,
+    limit: Optional[int] = None,
+) -> dict:
+    """
+    Joins the documents of `model` whose `foreign_field` equals `local_field`,
+    the sub-pipeline lets us project and cap the joined documents in the server
+    """
+    pipeline = [
+        {"$match": {"$expr": {"$eq": [f"${foreign_field}", "$$local_value"]}}},
+        *paginate(limit),
+    ]
+    if projection:
+        pipeline.append({"$project": projection})
+    return {
+        "$lookup": {
+            "from": collection_name(model),
+            "let": {"local_value": f"${local_field}"},
+            "pipeline": pipeline,
+            "as": as_field,
+        }
+    }
+
+
+def owner_update(user_id: str, values: dict) -> List[dict]:
+    """
+    Update pipeline that only sets `values` when the document belongs to
+    `user_id`, other owners get their document back unchanged
+    """
+    owned = {"$eq": ["$user_id", user_id]}
+    return [
+        {
+            "$set": {
+                field: {"$cond": [owned, {"$literal": value}, f"${field}"]}
+                for field, value in values.items()
+            }
+        }
+    ]
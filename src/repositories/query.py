@@ -1,78 +1,126 @@
 from models.query import Query
+from models.connection import Connection
+from repositories.pipelines import build_query, lookup, match, paginate, project
+from repositories.cache import evict_queries, evict_query, queries_cache
+from repositories.connection import opened
 from errors import CustomException, ERR_INTERNAL
 from beanie import PydanticObjectId as ObjectId
-from typing import Optional, List
+from typing import Optional, List, Set
 from schemas.query import QueryUpdate
-from motor.motor_asyncio import AsyncIOMotorClient as Session
-from schemas.query import QueryTypeResponse
+from repositories.session import Repository
+from schemas.query import QueryTypePartialResponse, QueryTypeResponse
 
 
-class QueryRepository:
-    session: Session = None
+def connection_stages() -> List[dict]:
+    """
+    Embeds each query's connection and exposes its type as connection_type
+    """
+    return [
+        lookup(
+            Connection,
+            "connection_id",
+            "_id",
+            "connection",
+            projection={
+                "name": 1,
+                "user_id": 1,
+                "type": 1,
+                "credentials": 1,
+                "variables": 1,
+            },
+        ),
+        {
+            "$unwind": {
+                "path": "$connection",
+                "preserveNullAndEmptyArrays": True,
+            }
+        },
+        {"$addFields": {"connection_type": "$connection.type"}},
+    ]
 
+
+def projected_stages(fields: Optional[Set[str]], *required: str) -> List[dict]:
+    """
+    Stages applied after matching the queries, only joining the connection
+    when it or its type was requested
+    """
+    if not fields:
+        return connection_stages()
+    if not fields & {"connection", "connection_type"}:
+        return [project(fields, *required)]
+    return [project(fields, "connection_id", *required), *connection_stages()]
+
+
+class QueryRepository(Repository):
     async def create(self, query: Query) -> Query:
         try:
             await query.insert(session=self.session)
+            evict_query(query.id, query.connection_id)
             return query
         except Exception as e:
             raise CustomException(500, ERR_INTERNAL, f"Error creating query: {str(e)}")
 
-    async def get_by_id(self, query_id: ObjectId) -> Optional[QueryTypeResponse]:
+    async def get_by_id(
+        self, query_id: ObjectId, fields: Optional[Set[str]] = None
+    ) -> Optional[QueryTypeResponse]:
+        loader = None if fields else self.loader("query", self.get_by_ids)
+        if loader:
+            return await loader.load(query_id)
         try:
+            # reads inside a transaction must see its own writes and projected
+            # reads only hold some fields, both skip the cache
+            cached = not self.session and not fields
+            query = queries_cache.get(query_id) if cached else None
+            if query:
+                return query
+            generation = queries_cache.generation
             pipeline = [
                 {"$match": {"_id": query_id}},
-                {
-                    "$lookup": {
-                        "from": "Connection",
-                        "localField": "connection_id",
-                        "foreignField": "_id",
-                        "as": "connection",
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$connection",
-                        "preserveNullAndEmptyArrays": True,
-                    }
-                },
-                {
-                    "$addFields": {
-                        "connection_type": "$connection.type",
-                    }
-                },
-                {
-                    "$project": {
-                        "connection.id": "$connection._id",
-                        "connection.name": "$connection.name",
-                        "connection.user_id": "$connection.user_id",
-                        "connection.type": "$connection.type",
-                        "connection.credentials": "$connection.credentials",
-                        "connection.variables": "$connection.variables",
-                        "connection_id": 1,
-                        "name": 1,
-                        "user_id": 1,
-                        "connection_type": 1,
-                        "metadata": 1,
-                    }
-                },
+                *projected_stages(fields, "user_id"),
             ]
             queries = await Query.aggregate(
-                pipeline, projection_model=QueryTypeResponse, session=self.session
+                pipeline,
+                projection_model=(
+                    QueryTypePartialResponse if fields else QueryTypeResponse
+                ),
+                session=self.session,
             ).to_list()
+            for query in queries:
+                opened(query.connection)
+            if queries and cached:
+                queries_cache.set(query_id, queries[0], generation)
             return queries[0] if queries else None
 
         except Exception as e:
             raise CustomException(500, ERR_INTERNAL, f"Error fetching query: {str(e)}")
 
+    async def get_by_ids(self, query_ids: List[ObjectId]) -> List[QueryTypeResponse]:
+        try:
+            cached = [] if self.session else queries_cache.get_many(query_ids)
+            missing = list(set(query_ids) - {query.id for query in cached})
+            if not missing:
+                return cached
+            generation = queries_cache.generation
+            pipeline = [{"$match": {"_id": {"$in": missing}}}, *connection_stages()]
+            queries = await Query.aggregate(
+                pipeline, projection_model=QueryTypeResponse, session=self.session
+            ).to_list()
+            for query in queries:
+                opened(query.connection)
+            if not self.session:
+                for query in queries:
+                    queries_cache.set(query.id, query, generation)
+            return cached + queries
+
+        except Exception as e:
+            raise CustomException(500, ERR_INTERNAL, f"Error fetching queries: {str(e)}")
+
     async def update(
         self, query_id: ObjectId, query_query: QueryUpdate
     ) -> Optional[Query]:
         try:
-            query = await Query.get(query_id, session=self.session)
-            data = {}
-            for attr in query_query.model_fields_set:
-                data[attr] = getattr(query_query, attr)
-            await query.update({"$set": data}, session=self.session)
+            query = await self.update_owned(Query, query_id, query_query)
+            evict_query(query_id, query.connection_id if query else None)
             return query
         except Exception as e:
             raise CustomException(500, ERR_INTERNAL, f"Error updating query: {str(e)}")
@@ -81,58 +129,40 @@ class QueryRepository:
         try:
             query = await Query.get(query_id, session=self.session)
             res = await query.delete(session=self.session)
+            evict_query(query_id, query.connection_id)
             return res.deleted_count > 0
         except Exception as e:
             raise CustomException(500, ERR_INTERNAL, f"Error deleting query: {str(e)}")
 
-    async def get(self, filters: List) -> List[QueryTypeResponse]:
+    async def delete_many(self, filters: List) -> int:
         try:
-            match_stage = {"$match": {}}
-            for filter in filters:
-                match_stage["$match"][filter["name"]] = {
-                    filter["operator"]: filter["value"]
-                }
+            res = await Query.find(build_query(filters), session=self.session).delete(
+                session=self.session
+            )
+            evict_queries()
+            return res.deleted_count
+        except Exception as e:
+            raise CustomException(500, ERR_INTERNAL, f"Error deleting queries: {str(e)}")
 
-            pipeline = [
-                match_stage,
-                {
-                    "$lookup": {
-                        "from": "Connection",
-                        "localField": "connection_id",
-                        "foreignField": "_id",
-                        "as": "connection",
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$connection",
-                        "preserveNullAndEmptyArrays": True,
-                    }
-                },
-                {
-                    "$addFields": {
-                        "connection_type": "$connection.type",
-                    }
-                },
-                {
-                    "$project": {
-                        "connection.id": "$connection._id",
-                        "connection.name": "$connection.name",
-                        "connection.user_id": "$connection.user_id",
-                        "connection.type": "$connection.type",
-                        "connection.credentials": "$connection.credentials",
-                        "connection.variables": "$connection.variables",
-                        "connection_id": 1,
-                        "name": 1,
-                        "user_id": 1,
-                        "connection_type": 1,
-                        "metadata": 1,
-                    }
-                },
-            ]
-            queries = await Query.aggregate(
-                pipeline, projection_model=QueryTypeResponse, session=self.session
-            ).to_list()
+    async def get(
+        self,
+        filters: List,
+        limit: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> List[dict]:
+        """
+        Reads plain dicts for the list endpoints, skipping the models
+        """
+        try:
+            fields = fields or set(QueryTypePartialResponse.model_fields)
+            pipeline = [match(filters), *paginate(limit), *projected_stages(fields)]
+            queries = await (
+                self.stale_collection(Query)
+                .aggregate(pipeline, session=self.session)
+                .to_list(None)
+            )
+            for query in queries:
+                opened(query.get("connection"))
             return queries
 
         except Exception as e:
@@ -2,8 +2,9 @@ from repositories.connection import ConnectionRepository
 from repositories.query import QueryRepository
 from repositories.dashboard import DashboardRepository
 from repositories.folder import FolderRepository
+from repositories.session import current_session
 from typing import Callable
-from configs.database import MongoDB
+from configs.database import MongoDB, mongodb
 
 
 class RepositoryRegistry:
@@ -16,9 +17,12 @@ class RepositoryRegistry:
 
     async def transaction(self, fn: Callable):
         async with self.db.start_session() as session:
-            self.connection.session = session
-            self.query.session = session
-            self.dashboard.session = session
-            self.folder.session = session
-            async with session.start_transaction():
-                return await fn(self)
+            token = current_session.set(session)
+            try:
+                async with session.start_transaction():
+                    return await fn(self)
+            finally:
+                current_session.reset(token)
+
+
+registry = RepositoryRegistry(mongodb)
@@ -0,0 +1,80 @@
+import inspect
+from beanie import Document
+from contextvars import ContextVar
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+from pymongo.read_preferences import SecondaryPreferred
+from typing import Callable, Optional, Type
+from motor.motor_asyncio import AsyncIOMotorClientSession as Session
+from motor.motor_asyncio import AsyncIOMotorCollection
+from configs.settings import settings
+from lib.loader import DataLoader, get_loader
+from lib.metrics import traced
+from repositories.pipelines import owner_update
+
+# Set by RepositoryRegistry.transaction, so concurrent requests sharing the
+# repositories never see each other's session
+current_session: ContextVar[Optional[Session]] = ContextVar(
+    "current_session", default=None
+)
+
+
+class Repository:
+    def __init_subclass__(cls, **kwargs):
+        # tags the Mongo commands each public method sends in the metrics
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if inspect.iscoroutinefunction(attr) and not name.startswith("_"):
+                setattr(cls, name, traced(f"{cls.__name__}.{name}", attr))
+
+    @property
+    def session(self) -> Optional[Session]:
+        return current_session.get()
+
+    def stale_collection(self, model: Type[Document]) -> AsyncIOMotorCollection:
+        """
+        Collection for reads that tolerate slightly stale data, routed to the
+        secondaries unless we are inside a transaction
+        """
+        collection = model.get_motor_collection()
+        if self.session or not settings.DB_SECONDARY_READS:
+            return collection
+        return collection.with_options(
+            read_preference=SecondaryPreferred(
+                max_staleness=settings.DB_MAX_STALENESS_SECONDS
+            )
+        )
+
+    def loader(self, name: str, batch_load: Callable) -> Optional[DataLoader]:
+        """
+        Loader shared by the current request, None outside of requests and
+        inside transactions, which must read their own writes
+        """
+        if self.session:
+            return None
+        return get_loader(name, batch_load)
+
+    async def update_owned(
+        self, model: Type[Document], document_id, update_query: BaseModel
+    ) -> Optional[Document]:
+        """
+        Applies the fields set in `update_query` in a single round trip.
+        Returns None when the document does not exist and the unchanged
+        document when it belongs to another user than `update_query.user_id`
+        """
+        values = {}
+        for attr in update_query.model_fields_set - {"user_id"}:
+            values[attr] = getattr(update_query, attr)
+        collection = model.get_motor_collection()
+        if values:
+            document = await collection.find_one_and_update(
+                {"_id": document_id},
+                owner_update(update_query.user_id, values),
+                return_document=ReturnDocument.AFTER,
+                session=self.session,
+            )
+        else:
+            document = await collection.find_one(
+                {"_id": document_id}, session=self.session
+            )
+        return model.model_validate(document) if document else None
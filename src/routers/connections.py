@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends
-from typing import List
 from services.connection import ConnectionService
 from beanie import PydanticObjectId as ObjectId
 from schemas.connection import (
     ConnectionCreate,
+    ConnectionPartialResponse,
     ConnectionUpdate,
     ConnectionResponse,
     ConnectionsGet,
 )
-from repositories.registry import RepositoryRegistry
-from configs.database import mongodb as db
+from schemas.pagination import Page
+from lib.responses import MongoJSONResponse
+from repositories.registry import registry
 from fastapi.security import APIKeyHeader
 
 ConnectionsRouter = APIRouter(prefix="/v1/connections", tags=["connections"])
@@ -17,10 +18,11 @@ ConnectionsRouter = APIRouter(prefix="/v1/connections", tags=["connections"])
 api_key_query = APIKeyHeader(name="api_key", auto_error=False)
 
 
+connection_service = ConnectionService(registry)
+
+
 def get_connection_service():
-    repository = RepositoryRegistry(db)
-    service = ConnectionService(repository)
-    return service
+    return connection_service
 
 
 @ConnectionsRouter.post("/", response_model=ConnectionResponse)
@@ -31,22 +33,27 @@ async def create_connection(
     return await service.create_connection(connection)
 
 
-@ConnectionsRouter.get("/{connection_id}", response_model=ConnectionResponse)
+@ConnectionsRouter.get(
+    "/{connection_id}",
+    response_model=ConnectionPartialResponse,
+    response_model_exclude_unset=True,
+)
 async def get_connection(
     connection_id: ObjectId,
     user_id: str | None = None,
+    fields: str | None = None,
     api_key: str = Depends(api_key_query),
     service: ConnectionService = Depends(get_connection_service),
 ):
-    return await service.get_connection_by_id(connection_id, user_id, api_key)
+    return await service.get_connection_by_id(connection_id, user_id, api_key, fields)
 
 
-@ConnectionsRouter.get("/", response_model=List[ConnectionResponse])
+@ConnectionsRouter.get("/", response_model=Page[ConnectionPartialResponse])
 async def list_connections(
     connections: ConnectionsGet = Depends(),
     service: ConnectionService = Depends(get_connection_service),
 ):
-    return await service.get_connections(connections)
+    return MongoJSONResponse(await service.get_connections(connections))
 
 
 @ConnectionsRouter.patch("/{connection_id}", response_model=ConnectionResponse)
@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Header, Response
 from services.dashboard import DashboardService
 from beanie import PydanticObjectId as ObjectId
 from schemas.dashboard import (
+    DashboardBundleResponse,
     DashboardCreate,
+    DashboardPartialResponse,
     DashboardUpdate,
     DashboardResponse,
     DashboardsGet,
 )
-from repositories.registry import RepositoryRegistry
-from configs.database import mongodb as db
+from schemas.batch import BatchGet, BatchResponse
+from schemas.pagination import Page
+from lib.responses import MongoJSONResponse
+from repositories.registry import registry
 
 
 DashboardsRouter = APIRouter(prefix="/v1/dashboards", tags=["dashboards"])
 
 
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+dashboard_service = DashboardService(registry)
+
+
 def get_dashboard_service():
-    repository = RepositoryRegistry(db)
-    service = DashboardService(repository)
-    return service
+    return dashboard_service
 
 
 @DashboardsRouter.post("/{dashboard_id}/published", response_model=DashboardResponse)
@@ -30,6 +41,13 @@ async def publish_dashboard(
     return await service.publish_dashboard(dashboard_id, user_id)
 
 
+@DashboardsRouter.post(":batchGet", response_model=BatchResponse[DashboardResponse])
+async def batch_get_dashboards(
+    batch: BatchGet, service: DashboardService = Depends(get_dashboard_service)
+):
+    return await service.get_dashboards_by_ids(batch)
+
+
 @DashboardsRouter.post("/", response_model=DashboardResponse)
 async def create_dashboard(
     dashboard: DashboardCreate, service: DashboardService = Depends(get_dashboard_service)
@@ -40,18 +58,50 @@ async def create_dashboard(
 @DashboardsRouter.get("/{dashboard_id}/published", response_model=DashboardResponse)
 async def get_published_dashboard(
     dashboard_id: ObjectId,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     service: DashboardService = Depends(get_dashboard_service),
 ):
-    return await service.get_published_dashboard(dashboard_id)
+    published_dashboard = await service.get_published_dashboard(dashboard_id)
+    etag = f'"{published_dashboard.version}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return published_dashboard.dashboard
 
 
-@DashboardsRouter.get("/{dashboard_id}", response_model=DashboardResponse)
+@DashboardsRouter.get(
+    "/{dashboard_id}/published/bundle", response_model=DashboardBundleResponse
+)
+async def get_published_dashboard_bundle(
+    dashboard_id: ObjectId,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    service: DashboardService = Depends(get_dashboard_service),
+):
+    published_dashboard = await service.get_published_dashboard(dashboard_id)
+    etag = f'"{published_dashboard.version}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {
+        "dashboard": published_dashboard.dashboard,
+        "queries": published_dashboard.queries,
+    }
+
+
+@DashboardsRouter.get(
+    "/{dashboard_id}",
+    response_model=DashboardPartialResponse,
+    response_model_exclude_unset=True,
+)
 async def get_dashboard(
     dashboard_id: ObjectId,
     user_id: str,
+    fields: str | None = None,
     service: DashboardService = Depends(get_dashboard_service),
 ):
-    return await service.get_dashboard_by_id(dashboard_id, user_id)
+    return await service.get_dashboard_by_id(dashboard_id, user_id, fields)
 
 
 @DashboardsRouter.patch("/{dashboard_id}", response_model=DashboardResponse)
@@ -72,9 +122,9 @@ async def delete_dashboard(
     return await service.delete_dashboard(dashboard_id, user_id)
 
 
-@DashboardsRouter.get("/", response_model=List[DashboardResponse])
+@DashboardsRouter.get("/", response_model=Page[DashboardPartialResponse])
 async def list_dashboards(
     dashboards: DashboardsGet = Depends(),
     service: DashboardService = Depends(get_dashboard_service),
 ):
-    return await service.get_dashboards(dashboards)
+    return MongoJSONResponse(await service.get_dashboards(dashboards))
@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends
-from typing import List
 from services.folder import FolderService
 from beanie import PydanticObjectId as ObjectId
-from schemas.folder import FolderCreate, FolderUpdate, FolderResponse, FoldersGet
-from repositories.registry import RepositoryRegistry
-from configs.database import mongodb as db
+from schemas.folder import (
+    FolderCreate,
+    FolderPartialResponse,
+    FolderUpdate,
+    FolderResponse,
+    FoldersGet,
+)
+from schemas.pagination import Page
+from lib.responses import MongoJSONResponse
+from repositories.registry import registry
 
 
 FoldersRouter = APIRouter(prefix="/v1/folders", tags=["folders"])
 
 
+folder_service = FolderService(registry)
+
+
 def get_folder_service():
-    repository = RepositoryRegistry(db)
-    service = FolderService(repository)
-    return service
+    return folder_service
 
 
 @FoldersRouter.post("/", response_model=FolderResponse)
@@ -23,13 +30,18 @@ async def create_folder(
     return await service.create_folder(folder)
 
 
-@FoldersRouter.get("/{folder_id}", response_model=FolderResponse)
+@FoldersRouter.get(
+    "/{folder_id}",
+    response_model=FolderPartialResponse,
+    response_model_exclude_unset=True,
+)
 async def get_folder(
     folder_id: ObjectId,
     user_id: str,
+    fields: str | None = None,
     service: FolderService = Depends(get_folder_service),
 ):
-    return await service.get_folder_by_id(folder_id, user_id)
+    return await service.get_folder_by_id(folder_id, user_id, fields)
 
 
 @FoldersRouter.patch("/{folder_id}", response_model=FolderResponse)
@@ -50,8 +62,8 @@ async def delete_folder(
     return await service.delete_folder(folder_id, user_id)
 
 
-@FoldersRouter.get("/", response_model=List[FolderResponse])
+@FoldersRouter.get("/", response_model=Page[FolderPartialResponse])
 async def list_folders(
     folders: FoldersGet = Depends(), service: FolderService = Depends(get_folder_service)
 ):
-    return await service.get_folders(folders)
+    return MongoJSONResponse(await service.get_folders(folders))
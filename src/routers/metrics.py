@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from lib.metrics import CacheCollector, PoolCollector
+from lib.pool import pool_metrics
+from services.query import query_results
+from repositories.cache import (
+    connections_cache,
+    dashboards_cache,
+    published_dashboards_cache,
+    queries_cache,
+)
+
+MetricsRouter = APIRouter(tags=["metrics"])
+
+REGISTRY.register(
+    CacheCollector(
+        {
+            "published_dashboards": published_dashboards_cache,
+            "dashboards": dashboards_cache,
+            "connections": connections_cache,
+            "queries": queries_cache,
+            "query_results": query_results,
+        }
+    )
+)
+REGISTRY.register(PoolCollector(pool_metrics))
+
+
+@MetricsRouter.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
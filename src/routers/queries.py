@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
 from services.query import QueryService
 from beanie import PydanticObjectId as ObjectId
 from schemas.query import (
     QueryCreate,
+    QueryExecute,
+    QueryResultResponse,
     QueryUpdate,
     QueryResponse,
     QueriesGet,
+    QueryTypePartialResponse,
     QueryTypeResponse,
 )
-from repositories.registry import RepositoryRegistry
-from configs.database import mongodb as db
+from schemas.batch import BatchGet, BatchResponse
+from schemas.pagination import Page
+from lib.responses import MongoJSONResponse
+from lib.streaming import (
+    ARROW_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    accepts,
+    arrow,
+    ndjson,
+    require_pyarrow,
+)
+from repositories.registry import registry
 from fastapi.security import APIKeyHeader
 
 QueriesRouter = APIRouter(prefix="/v1/queries", tags=["queries"])
@@ -18,10 +31,11 @@ QueriesRouter = APIRouter(prefix="/v1/queries", tags=["queries"])
 api_key_query = APIKeyHeader(name="api_key", auto_error=False)
 
 
+query_service = QueryService(registry)
+
+
 def get_query_service():
-    repository = RepositoryRegistry(db)
-    service = QueryService(repository)
-    return service
+    return query_service
 
 
 @QueriesRouter.post("/", response_model=QueryResponse)
@@ -31,14 +45,52 @@ async def create_query(
     return await service.create_query(query)
 
 
-@QueriesRouter.get("/{query_id}", response_model=QueryTypeResponse)
+@QueriesRouter.post(":batchGet", response_model=BatchResponse[QueryTypeResponse])
+async def batch_get_queries(
+    batch: BatchGet,
+    api_key: str = Depends(api_key_query),
+    service: QueryService = Depends(get_query_service),
+):
+    return await service.get_queries_by_ids(batch, api_key)
+
+
+@QueriesRouter.get(
+    "/{query_id}",
+    response_model=QueryTypePartialResponse,
+    response_model_exclude_unset=True,
+)
 async def get_query(
     query_id: ObjectId,
     user_id: str | None = None,
+    fields: str | None = None,
+    api_key: str = Depends(api_key_query),
+    service: QueryService = Depends(get_query_service),
+):
+    return await service.get_query_by_id(query_id, user_id, api_key, fields)
+
+
+@QueriesRouter.post(
+    "/{query_id}/execute",
+    response_model=QueryResultResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, ARROW_MEDIA_TYPE: {}}}},
+)
+async def execute_query(
+    query_id: ObjectId,
+    query: QueryExecute,
+    accept: str | None = Header(default=None),
     api_key: str = Depends(api_key_query),
     service: QueryService = Depends(get_query_service),
 ):
-    return await service.get_query_by_id(query_id, user_id, api_key)
+    if accepts(accept, ARROW_MEDIA_TYPE):
+        require_pyarrow()
+        rows = await service.stream_query(query_id, query, api_key)
+        return StreamingResponse(await arrow(rows), media_type=ARROW_MEDIA_TYPE)
+    if accepts(accept, NDJSON_MEDIA_TYPE):
+        rows = await service.stream_query(query_id, query, api_key)
+        return StreamingResponse(ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
+    # rows are written as they come from the source, skipping validation
+    rows = await service.execute_query(query_id, query, api_key)
+    return MongoJSONResponse({"rows": rows})
 
 
 @QueriesRouter.patch("/{query_id}", response_model=QueryResponse)
@@ -57,8 +109,8 @@ async def delete_query(
     return await service.delete_query(query_id, user_id)
 
 
-@QueriesRouter.get("/", response_model=List[QueryTypeResponse])
+@QueriesRouter.get("/", response_model=Page[QueryTypePartialResponse])
 async def list_queries(
     queries: QueriesGet = Depends(), service: QueryService = Depends(get_query_service)
 ):
-    return await service.get_queries(queries)
+    return MongoJSONResponse(await service.get_queries(queries))
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Dict, Generic, List, Optional, TypeVar
+from beanie import PydanticObjectId as ObjectId
+from pydantic import Field
+
+MAX_BATCH_SIZE = 100
+
+T = TypeVar("T")
+
+
+class BatchGet(BaseModel):
+    user_id: Optional[str] = None
+    ids: List[ObjectId] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchError(BaseModel):
+    code: str
+    description: str
+
+
+class BatchItem(BaseModel, Generic[T]):
+    item: Optional[T] = None
+    error: Optional[BatchError] = None
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    """
+    Results keyed by the requested ids, each one holds either the item or
+    the error we would have answered for it alone
+    """
+
+    results: Dict[str, BatchItem[T]]
@@ -4,6 +4,7 @@ from beanie import PydanticObjectId as ObjectId
 from models.connection import ConnectionType
 from schemas.query import QueryResponse
 from pydantic import Field
+from schemas.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class ConnectionCreate(BaseModel):
@@ -25,6 +26,9 @@ class ConnectionsGet(BaseModel):
     user_id: str
     name: Optional[str] = None
     type: Optional[ConnectionType] = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class ConnectionResponse(BaseModel):
@@ -39,3 +43,17 @@ class ConnectionResponse(BaseModel):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+
+class ConnectionPartialResponse(BaseModel):
+    id: ObjectId = Field(alias="_id")
+    name: Optional[str] = None
+    user_id: Optional[str] = None
+    type: Optional[ConnectionType] = None
+    credentials: Optional[dict] = None
+    variables: Optional[dict] = None
+    queries: Optional[List[QueryResponse]] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from beanie import PydanticObjectId as ObjectId
 from pydantic import Field
+from schemas.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from schemas.query import BundleQueryResponse
 
 
 class DashboardCreate(BaseModel):
@@ -22,6 +24,9 @@ class DashboardsGet(BaseModel):
     user_id: str
     folder_id: Optional[ObjectId] = None
     name: Optional[str] = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class DashboardResponse(BaseModel):
@@ -34,3 +39,39 @@ class DashboardResponse(BaseModel):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+
+class DashboardSummaryResponse(BaseModel):
+    id: ObjectId = Field(alias="_id")
+    name: str
+    folder_id: Optional[ObjectId] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class DashboardPartialResponse(BaseModel):
+    """
+    Dashboard restricted to the requested `fields`, the ones left out are unset
+    """
+
+    id: ObjectId = Field(alias="_id")
+    user_id: Optional[str] = None
+    name: Optional[str] = None
+    folder_id: Optional[ObjectId] = None
+    metadata: Optional[dict] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class DashboardBundleResponse(BaseModel):
+    """
+    Published dashboard along with the queries its widgets use, without
+    their connections' credentials
+    """
+
+    dashboard: DashboardResponse
+    queries: List[BundleQueryResponse]
@@ -1,8 +1,9 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from beanie import PydanticObjectId as ObjectId
-from schemas.dashboard import DashboardResponse
+from schemas.dashboard import DashboardSummaryResponse
 from pydantic import Field
+from schemas.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class FolderCreate(BaseModel):
@@ -18,13 +19,28 @@ class FolderUpdate(BaseModel):
 class FoldersGet(BaseModel):
     user_id: str
     name: Optional[str] = None
+    dashboards_limit: Optional[int] = Field(default=None, ge=1)
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class FolderResponse(BaseModel):
     id: ObjectId = Field(alias="_id")
     name: str
     user_id: str
-    dashboards: List[DashboardResponse]
+    dashboards: List[DashboardSummaryResponse]
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class FolderPartialResponse(BaseModel):
+    id: ObjectId = Field(alias="_id")
+    name: Optional[str] = None
+    user_id: Optional[str] = None
+    dashboards: Optional[List[DashboardSummaryResponse]] = None
 
     class Config:
         from_attributes = True
@@ -1,7 +1,9 @@
+from enum import Enum
 from pydantic import BaseModel
-from typing import Optional
+from typing import Annotated, List, Optional
 from beanie import PydanticObjectId as ObjectId
 from pydantic import Field
+from schemas.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class QueryCreate(BaseModel):
@@ -21,6 +23,9 @@ class QueriesGet(BaseModel):
     user_id: str
     name: Optional[str] = None
     connection_id: Optional[ObjectId] = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
@@ -60,3 +65,111 @@ class QueryTypeResponse(BaseModel):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+
+class BundleConnectionResponse(BaseModel):
+    """
+    Connection as published in a dashboard bundle, which anyone can read,
+    so its credentials are left out
+    """
+
+    id: ObjectId = Field(alias="_id")
+    name: str
+    user_id: str
+    type: str
+    variables: Optional[dict] = {}
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class BundleQueryResponse(BaseModel):
+    """
+    Query as published in a dashboard bundle. Viewers run it by id, so its
+    definition is left out and only the variables it takes are listed
+    """
+
+    id: ObjectId = Field(alias="_id")
+    name: str
+    user_id: str
+    connection_id: ObjectId
+    connection_type: str
+    connection: BundleConnectionResponse
+    variables: List[str] = []
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class QueryTypePartialResponse(BaseModel):
+    id: ObjectId = Field(alias="_id")
+    name: Optional[str] = None
+    user_id: Optional[str] = None
+    connection_id: Optional[ObjectId] = None
+    connection_type: Optional[str] = None
+    connection: Optional[ConnectionOnQueryResponse] = None
+    metadata: Optional[dict] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+# column names are written into pipelines and SQL statements
+Column = Annotated[str, Field(pattern=r"^[A-Za-z_][A-Za-z0-9_]*$")]
+
+
+class AggregateFunction(str, Enum):
+    COUNT = "count"
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+
+
+class Aggregation(BaseModel):
+    function: AggregateFunction = AggregateFunction.COUNT
+    # every function but count needs a column
+    column: Optional[Column] = None
+    alias: Optional[Column] = None
+
+    @property
+    def name(self) -> str:
+        if self.alias:
+            return self.alias
+        if self.column:
+            return f"{self.function.value}_{self.column}"
+        return self.function.value
+
+
+class Transform(BaseModel):
+    """
+    Applied to the rows of a query, in this order: rows are grouped by
+    `group_by` and by `interval` seconds buckets of `time_column`, computing
+    the aggregations (a count by default), then the `top_k` rows with the
+    highest `sort_by` are kept and finally downsampled to `points` (x, y)
+    points with LTTB, x defaulting to `time_column`
+    """
+
+    group_by: List[Column] = []
+    time_column: Optional[Column] = None
+    interval: Optional[int] = Field(default=None, ge=1)
+    aggregations: List[Aggregation] = []
+    top_k: Optional[int] = Field(default=None, ge=1)
+    sort_by: Optional[Column] = None
+    points: Optional[int] = Field(default=None, ge=3)
+    x: Optional[Column] = None
+    y: Optional[Column] = None
+
+
+class QueryExecute(BaseModel):
+    user_id: Optional[str] = None
+    # override the connection's variables for this execution
+    variables: dict = {}
+    transform: Optional[Transform] = None
+
+
+class QueryResultResponse(BaseModel):
+    rows: List[dict]
@@ -1,17 +1,21 @@
 from models.connection import Connection
 from schemas.connection import (
     ConnectionCreate,
+    ConnectionPartialResponse,
     ConnectionResponse,
     ConnectionsGet,
     ConnectionUpdate,
 )
 from beanie import PydanticObjectId as ObjectId
 from errors import CustomException, ERR_CONNECTION_NOT_FOUND, ERR_NOT_AUTHORIZED
-from typing import Optional, List
+from typing import Optional
 from repositories.registry import RepositoryRegistry
 from configs.database import Operators
 from configs.settings import settings
-from lib.encryption import encrypt, decrypt
+from lib.encryption import encrypt, decrypt, preview
+from schemas.pagination import Page
+from lib.fields import parse_fields
+from lib.pagination import decode_cursor, paginate
 
 
 class ConnectionService:
@@ -28,7 +32,8 @@ class ConnectionService:
         for key, value in connection_query.credentials.items():
             if key == "openai_api_key":
                 credentials[key] = encrypt(value)
-            else:
+                credentials["openai_api_key_preview"] = preview(value)
+            elif key != "openai_api_key_preview":
                 credentials[key] = value
         connection = Connection(
             name=connection_query.name,
@@ -38,10 +43,6 @@ class ConnectionService:
             variables=connection_query.variables,
         )
         created_connection = await self.repo.connection.create(connection)
-        if "openai_api_key" in created_connection.credentials:
-            created_connection.credentials["openai_api_key_preview"] = (
-                "*" * 5 + connection_query.credentials["openai_api_key"][-4:]
-            )
         return ConnectionResponse(
             id=created_connection.id,
             name=created_connection.name,
@@ -53,9 +54,15 @@ class ConnectionService:
         )
 
     async def get_connection_by_id(
-        self, connection_id: ObjectId, user_id: str, api_key: str
+        self,
+        connection_id: ObjectId,
+        user_id: str,
+        api_key: str,
+        fields: Optional[str] = None,
     ) -> Optional[ConnectionResponse]:
-        connection = await self.repo.connection.get_by_id(connection_id)
+        connection = await self.repo.connection.get_by_id(
+            connection_id, parse_fields(fields, ConnectionPartialResponse)
+        )
         if not connection:
             raise CustomException(
                 status_code=404,
@@ -68,10 +75,6 @@ class ConnectionService:
                 error_code=ERR_NOT_AUTHORIZED,
                 description="You are not authorized to access this connection",
             )
-        if "openai_api_key" in connection.credentials:
-            connection.credentials["openai_api_key_preview"] = (
-                "*" * 5 + decrypt(connection.credentials["openai_api_key"])[-4:]
-            )
         return connection
 
     async def update_connection(
@@ -93,6 +96,7 @@ class ConnectionService:
         #  we store the old main_url and the encrypted api key in the existing connection
         # to use it if the connection query does not contain one of them
         encrypted_api_key = connection.credentials.get("openai_api_key", None)
+        api_key_preview = connection.credentials.get("openai_api_key_preview", None)
         main_url = connection.credentials.get("main_url", None)
 
         if "main_url" not in connection_query.credentials and main_url:
@@ -100,21 +104,21 @@ class ConnectionService:
 
         if "openai_api_key" in connection_query.credentials:
             unencrypted_api_key = connection_query.credentials["openai_api_key"]
-            connection_query.credentials["openai_api_key"] = encrypt(
-                connection_query.credentials["openai_api_key"]
+            connection_query.credentials["openai_api_key"] = encrypt(unencrypted_api_key)
+            connection_query.credentials["openai_api_key_preview"] = preview(
+                unencrypted_api_key
+            )
+        elif encrypted_api_key:
+            connection_query.credentials["openai_api_key"] = encrypted_api_key
+            connection_query.credentials["openai_api_key_preview"] = (
+                api_key_preview or preview(decrypt(encrypted_api_key))
             )
         else:
-            if encrypted_api_key:
-                connection_query.credentials["openai_api_key"] = encrypted_api_key
-                unencrypted_api_key = decrypt(encrypted_api_key)
+            connection_query.credentials.pop("openai_api_key_preview", None)
 
         updated_connection = await self.repo.connection.update(
             connection_id, connection_query
         )
-        if "openai_api_key" in updated_connection.credentials:
-            updated_connection.credentials["openai_api_key_preview"] = (
-                "*" * 5 + unencrypted_api_key[-4:]
-            )
         return ConnectionResponse(
             id=updated_connection.id,
             name=updated_connection.name,
@@ -141,7 +145,7 @@ class ConnectionService:
             )
 
         async def delete_connection_transaction(repo_registry: RepositoryRegistry):
-            queries = await repo_registry.query.get(
+            await repo_registry.query.delete_many(
                 [
                     {
                         "name": "connection_id",
@@ -150,16 +154,11 @@ class ConnectionService:
                     }
                 ]
             )
-            for query in queries:
-                await repo_registry.query.delete(query.id)
-
-            return await self.repo.connection.delete(connection_id)
+            return await repo_registry.connection.delete(connection_id)
 
         return await self.repo.transaction(delete_connection_transaction)
 
-    async def get_connections(
-        self, connections_query: ConnectionsGet
-    ) -> List[ConnectionResponse]:
+    async def get_connections(self, connections_query: ConnectionsGet) -> Page[dict]:
         filters = []
         if connections_query.user_id:
             filters.append(
@@ -185,10 +184,16 @@ class ConnectionService:
                     "operator": Operators.EQ,
                 }
             )
-        connections = await self.repo.connection.get(filters)
-        for connection in connections:
-            if "openai_api_key" in connection.credentials:
-                connection.credentials["openai_api_key_preview"] = (
-                    "*" * 5 + decrypt(connection.credentials["openai_api_key"])[-4:]
-                )
-        return connections
+        if connections_query.cursor:
+            filters.append(
+                {
+                    "name": "_id",
+                    "value": decode_cursor(connections_query.cursor),
+                    "operator": Operators.GT,
+                }
+            )
+        fields = parse_fields(connections_query.fields, ConnectionPartialResponse)
+        connections = await self.repo.connection.get(
+            filters, connections_query.limit + 1, fields
+        )
+        return paginate(connections, connections_query.limit)
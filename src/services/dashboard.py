@@ -1,6 +1,7 @@
-from models.dashboard import Dashboard
+from models.dashboard import Dashboard, PublishedDashboard
 from schemas.dashboard import (
     DashboardCreate,
+    DashboardPartialResponse,
     DashboardUpdate,
     DashboardResponse,
     DashboardsGet,
@@ -15,6 +16,13 @@ from errors import (
 )
 from repositories.registry import RepositoryRegistry
 from configs.database import Operators
+from schemas.query import BundleQueryResponse
+from lib.variables import referenced
+from schemas.batch import BatchError, BatchGet, BatchItem, BatchResponse
+from schemas.pagination import Page
+from lib.fields import parse_fields
+from lib.metadata import referenced_query_ids
+from lib.pagination import decode_cursor, paginate
 
 
 class DashboardService:
@@ -66,12 +74,27 @@ class DashboardService:
                 error_code=ERR_NOT_AUTHORIZED,
                 description="You are not authorized to publish this dashboard",
             )
-        await self.repo.dashboard.publish(dashboard_id, dashboard)
+        queries = await self.bundle_queries(dashboard)
+        await self.repo.dashboard.publish(dashboard_id, dashboard, queries)
         return dashboard
 
+    async def bundle_queries(self, dashboard: Dashboard) -> List[dict]:
+        query_ids = referenced_query_ids(dashboard.metadata)
+        if not query_ids:
+            return []
+        bundle = []
+        for query in await self.repo.query.get_by_ids(query_ids):
+            # a widget can not expose queries of someone else
+            if query.user_id != dashboard.user_id:
+                continue
+            bundled = BundleQueryResponse.model_validate(query)
+            bundled.variables = referenced(query.metadata)
+            bundle.append(bundled.model_dump(by_alias=True))
+        return bundle
+
     async def get_published_dashboard(
         self, dashboard_id: ObjectId
-    ) -> Optional[DashboardResponse]:
+    ) -> Optional[PublishedDashboard]:
         published_dashboard = await self.repo.dashboard.get_published(dashboard_id)
         if not published_dashboard:
             raise CustomException(
@@ -82,9 +105,11 @@ class DashboardService:
         return published_dashboard
 
     async def get_dashboard_by_id(
-        self, dashboard_id: ObjectId, user_id: str
+        self, dashboard_id: ObjectId, user_id: str, fields: Optional[str] = None
     ) -> Optional[DashboardResponse]:
-        dashboard = await self.repo.dashboard.get_by_id(dashboard_id)
+        dashboard = await self.repo.dashboard.get_by_id(
+            dashboard_id, parse_fields(fields, DashboardPartialResponse)
+        )
         if not dashboard:
             raise CustomException(
                 status_code=404,
@@ -99,22 +124,35 @@ class DashboardService:
             )
         return dashboard
 
+    async def get_dashboards_by_ids(
+        self, batch_query: BatchGet
+    ) -> BatchResponse[DashboardResponse]:
+        dashboards = {
+            dashboard.id: dashboard
+            for dashboard in await self.repo.dashboard.get_by_ids(batch_query.ids)
+        }
+        results = {}
+        for dashboard_id in batch_query.ids:
+            dashboard = dashboards.get(dashboard_id)
+            if not dashboard:
+                error = BatchError(
+                    code=ERR_DASHBOARD_NOT_FOUND,
+                    description="Could not find dashboard with the given id",
+                )
+                results[str(dashboard_id)] = BatchItem(error=error)
+            elif dashboard.user_id != batch_query.user_id:
+                error = BatchError(
+                    code=ERR_NOT_AUTHORIZED,
+                    description="You are not authorized to access this dashboard",
+                )
+                results[str(dashboard_id)] = BatchItem(error=error)
+            else:
+                results[str(dashboard_id)] = BatchItem(item=dashboard)
+        return BatchResponse(results=results)
+
     async def update_dashboard(
         self, dashboard_id, dashboard_query: DashboardUpdate
     ) -> Optional[DashboardResponse]:
-        dashboard = await self.repo.dashboard.get_by_id(dashboard_id)
-        if not dashboard:
-            raise CustomException(
-                status_code=404,
-                error_code=ERR_DASHBOARD_NOT_FOUND,
-                description="Could not find dashboard with the given id",
-            )
-        if dashboard.user_id != dashboard_query.user_id:
-            raise CustomException(
-                status_code=403,
-                error_code=ERR_NOT_AUTHORIZED,
-                description="You are not authorized to update this dashboard",
-            )
         if dashboard_query.folder_id:
             folder = await self.repo.folder.get_by_id(dashboard_query.folder_id)
             if not folder:
@@ -130,7 +168,22 @@ class DashboardService:
                     description="You are not authorized to move this dashboard here",
                 )
 
-        return await self.repo.dashboard.update(dashboard_id, dashboard_query)
+        # the update only applies to the owner's dashboard, so the returned
+        # document tells us whether it exists and who owns it
+        dashboard = await self.repo.dashboard.update(dashboard_id, dashboard_query)
+        if not dashboard:
+            raise CustomException(
+                status_code=404,
+                error_code=ERR_DASHBOARD_NOT_FOUND,
+                description="Could not find dashboard with the given id",
+            )
+        if dashboard.user_id != dashboard_query.user_id:
+            raise CustomException(
+                status_code=403,
+                error_code=ERR_NOT_AUTHORIZED,
+                description="You are not authorized to update this dashboard",
+            )
+        return dashboard
 
     async def delete_dashboard(self, dashboard_id: ObjectId, user_id: str) -> bool:
         dashboard = await self.repo.dashboard.get_by_id(dashboard_id)
@@ -148,18 +201,12 @@ class DashboardService:
             )
 
         async def delete_dashboard_transaction(repo_registry: RepositoryRegistry):
-            published_dashboard = await repo_registry.dashboard.get_published(
-                dashboard_id
-            )
-            if published_dashboard:
-                await repo_registry.dashboard.unpublish(published_dashboard.id)
+            await repo_registry.dashboard.unpublish(dashboard_id)
             return await repo_registry.dashboard.delete(dashboard_id)
 
         return await self.repo.transaction(delete_dashboard_transaction)
 
-    async def get_dashboards(
-        self, dashboards_query: DashboardsGet
-    ) -> List[DashboardResponse]:
+    async def get_dashboards(self, dashboards_query: DashboardsGet) -> Page[dict]:
         filters = []
         if dashboards_query.user_id:
             filters.append(
@@ -181,4 +228,16 @@ class DashboardService:
                     "operator": Operators.EQ,
                 }
             )
-        return await self.repo.dashboard.get(filters)
+        if dashboards_query.cursor:
+            filters.append(
+                {
+                    "name": "_id",
+                    "value": decode_cursor(dashboards_query.cursor),
+                    "operator": Operators.GT,
+                }
+            )
+        fields = parse_fields(dashboards_query.fields, DashboardPartialResponse)
+        dashboards = await self.repo.dashboard.get(
+            filters, dashboards_query.limit + 1, fields
+        )
+        return paginate(dashboards, dashboards_query.limit)
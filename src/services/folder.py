@@ -1,11 +1,19 @@
 from models.folder import Folder
-from typing import List, Optional
+from typing import Optional
 from bson import ObjectId
-from schemas.folder import FolderCreate, FolderUpdate, FolderResponse, FoldersGet
+from schemas.folder import (
+    FolderCreate,
+    FolderPartialResponse,
+    FolderUpdate,
+    FolderResponse,
+    FoldersGet,
+)
 from errors import CustomException, ERR_FOLDER_NOT_FOUND, ERR_NOT_AUTHORIZED
 from repositories.registry import RepositoryRegistry
-from schemas.dashboard import DashboardUpdate
 from configs.database import Operators
+from schemas.pagination import Page
+from lib.fields import parse_fields
+from lib.pagination import decode_cursor, paginate
 
 
 class FolderService:
@@ -29,9 +37,11 @@ class FolderService:
         )
 
     async def get_folder_by_id(
-        self, folder_id: ObjectId, user_id: str
+        self, folder_id: ObjectId, user_id: str, fields: Optional[str] = None
     ) -> Optional[FolderResponse]:
-        folder = await self.repo.folder.get_by_id(folder_id)
+        folder = await self.repo.folder.get_by_id(
+            folder_id, parse_fields(fields, FolderPartialResponse)
+        )
         if not folder:
             raise CustomException(
                 status_code=404,
@@ -87,18 +97,15 @@ class FolderService:
             )
 
         async def delete_folder_transaction(repo_registry: RepositoryRegistry):
-            dashboards = await repo_registry.dashboard.get(
-                [{"name": "folder_id", "value": folder_id, "operator": Operators.EQ}]
+            await repo_registry.dashboard.update_many(
+                [{"name": "folder_id", "value": folder_id, "operator": Operators.EQ}],
+                {"folder_id": None},
             )
-            for dashboard in dashboards:
-                await repo_registry.dashboard.update(
-                    dashboard.id, DashboardUpdate(folder_id=None)
-                )
             return await repo_registry.folder.delete(folder_id)
 
         return await self.repo.transaction(delete_folder_transaction)
 
-    async def get_folders(self, folder_query: FoldersGet) -> List[FolderResponse]:
+    async def get_folders(self, folder_query: FoldersGet) -> Page[dict]:
         filters = []
         if folder_query.user_id:
             filters.append(
@@ -116,4 +123,18 @@ class FolderService:
                     "operator": Operators.EQ,
                 }
             )
-        return await self.repo.folder.get(filters)
+        if folder_query.cursor:
+            filters.append(
+                {
+                    "name": "_id",
+                    "value": decode_cursor(folder_query.cursor),
+                    "operator": Operators.GT,
+                }
+            )
+        folders = await self.repo.folder.get(
+            filters,
+            folder_query.limit + 1,
+            folder_query.dashboards_limit,
+            parse_fields(folder_query.fields, FolderPartialResponse),
+        )
+        return paginate(folders, folder_query.limit)
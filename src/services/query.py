@@ -1,23 +1,54 @@
+import math
 from models.query import Query
 from beanie import PydanticObjectId as ObjectId
 from errors import (
     CustomException,
+    ERR_BAD_REQUEST,
     ERR_QUERY_NOT_FOUND,
     ERR_CONNECTION_NOT_FOUND,
     ERR_NOT_AUTHORIZED,
 )
-from typing import Optional, List
+from typing import AsyncIterator, List, Optional, Tuple
 from schemas.query import (
     QueriesGet,
     QueryResponse,
     QueryCreate,
+    QueryExecute,
     QueryUpdate,
+    QueryTypePartialResponse,
     QueryTypeResponse,
 )
 from repositories.registry import RepositoryRegistry
 from configs.database import Operators
 from configs.settings import settings
-from lib.encryption import decrypt
+from schemas.batch import BatchError, BatchGet, BatchItem, BatchResponse
+from schemas.pagination import Page
+from lib.fields import parse_fields
+from lib.result_cache import ResultCache, result_key
+from lib.streaming import prefetched
+from executors.registry import get_executor
+from lib.pagination import decode_cursor, paginate
+
+query_results = ResultCache(settings.RESULT_CACHE_MAX_BYTES)
+
+
+def cache_seconds(metadata: dict, name: str, default: float) -> float:
+    """
+    Reads a cache duration from the query metadata, variables resolve to
+    strings so "60" is read as 60 seconds
+    """
+    value = metadata.get(name, default)
+    try:
+        seconds = None if isinstance(value, bool) else float(value)
+    except (TypeError, ValueError):
+        seconds = None
+    if seconds is None or not math.isfinite(seconds) or seconds < 0:
+        raise CustomException(
+            400,
+            ERR_BAD_REQUEST,
+            f"{name} must be a number of seconds, got {value!r}",
+        )
+    return seconds
 
 
 class QueryService:
@@ -57,9 +88,15 @@ class QueryService:
         )
 
     async def get_query_by_id(
-        self, query_id: ObjectId, user_id: str, api_key: str
+        self,
+        query_id: ObjectId,
+        user_id: str,
+        api_key: str,
+        fields: Optional[str] = None,
     ) -> Optional[QueryTypeResponse]:
-        query = await self.repo.query.get_by_id(query_id)
+        query = await self.repo.query.get_by_id(
+            query_id, parse_fields(fields, QueryTypePartialResponse)
+        )
         if not query:
             raise CustomException(
                 status_code=404,
@@ -72,16 +109,89 @@ class QueryService:
                 error_code=ERR_NOT_AUTHORIZED,
                 description="You are not authorized to access this query",
             )
-        if "openai_api_key" in query.connection.credentials:
-            query.connection.credentials["openai_api_key_preview"] = (
-                "*" * 5 + decrypt(query.connection.credentials["openai_api_key"])[-4:]
-            )
         return query
 
+    async def get_queries_by_ids(
+        self, batch_query: BatchGet, api_key: str
+    ) -> BatchResponse[QueryTypeResponse]:
+        queries = {
+            query.id: query for query in await self.repo.query.get_by_ids(batch_query.ids)
+        }
+        results = {}
+        for query_id in batch_query.ids:
+            query = queries.get(query_id)
+            if not query:
+                error = BatchError(
+                    code=ERR_QUERY_NOT_FOUND,
+                    description="Could not find query with the given id",
+                )
+                results[str(query_id)] = BatchItem(error=error)
+            elif query.user_id != batch_query.user_id and settings.API_KEY != api_key:
+                error = BatchError(
+                    code=ERR_NOT_AUTHORIZED,
+                    description="You are not authorized to access this query",
+                )
+                results[str(query_id)] = BatchItem(error=error)
+            else:
+                results[str(query_id)] = BatchItem(item=query)
+        return BatchResponse(results=results)
+
+    async def resolve_query(
+        self, query_id: ObjectId, query_execute: QueryExecute, api_key: str
+    ) -> Tuple[QueryTypeResponse, dict]:
+        """
+        Returns the query, once the caller is authorized to run it, along with
+        its metadata with the variables resolved
+        """
+        query = await self.get_query_by_id(query_id, query_execute.user_id, api_key)
+        variables = {**query.connection.variables, **query_execute.variables}
+        executor = get_executor(query.connection_type)
+        return query, executor.resolve(query.metadata, variables)
+
+    async def execute_query(
+        self, query_id: ObjectId, query_execute: QueryExecute, api_key: str
+    ) -> List[dict]:
+        query, metadata = await self.resolve_query(query_id, query_execute, api_key)
+        executor = get_executor(query.connection_type)
+        # the resolved metadata holds the variables and the query definition,
+        # so edits to either never hit results cached before them
+        transform = query_execute.transform
+        ttl = cache_seconds(metadata, "cache_ttl", settings.RESULT_CACHE_TTL)
+        stale_ttl = cache_seconds(
+            metadata, "cache_stale_ttl", settings.RESULT_CACHE_STALE_SECONDS
+        )
+        key = result_key(
+            query.id,
+            metadata,
+            query.connection.credentials,
+            transform.model_dump() if transform else None,
+        )
+        return await query_results.get(
+            key,
+            lambda: executor.execute(query.connection, metadata, transform),
+            ttl,
+            stale_ttl,
+        )
+
+    async def stream_query(
+        self, query_id: ObjectId, query_execute: QueryExecute, api_key: str
+    ) -> AsyncIterator[dict]:
+        # streams skip the result cache, they are not bounded in size
+        query, metadata = await self.resolve_query(query_id, query_execute, api_key)
+        executor = get_executor(query.connection_type)
+        transform = query_execute.transform
+        if transform:
+            rows = executor.transformed(query.connection, metadata, transform)
+        else:
+            rows = executor.stream(query.connection, metadata)
+        return await prefetched(rows)
+
     async def update_query(
         self, query_id, query_query: QueryUpdate
     ) -> Optional[QueryResponse]:
-        query = await self.repo.query.get_by_id(query_id)
+        # the update only applies to the owner's query, so the returned
+        # document tells us whether it exists and who owns it
+        query = await self.repo.query.update(query_id, query_query)
         if not query:
             raise CustomException(
                 status_code=404,
@@ -94,10 +204,9 @@ class QueryService:
                 error_code=ERR_NOT_AUTHORIZED,
                 description="You are not authorized to update this query",
             )
-        updated_query = await self.repo.query.update(query_id, query_query)
-        return updated_query
+        return query
 
-    async def get_queries(self, query_query: QueriesGet) -> List[QueryTypeResponse]:
+    async def get_queries(self, query_query: QueriesGet) -> Page[dict]:
         filters = []
         if query_query.connection_id:
             filters.append(
@@ -119,13 +228,17 @@ class QueryService:
             filters.append(
                 {"name": "name", "value": query_query.name, "operator": Operators.EQ}
             )
-        queries = await self.repo.query.get(filters)
-        for query in queries:
-            if "openai_api_key" in query.connection.credentials:
-                query.connection.credentials["openai_api_key_preview"] = (
-                    "*" * 5 + decrypt(query.connection.credentials["openai_api_key"])[-4:]
-                )
-        return queries
+        if query_query.cursor:
+            filters.append(
+                {
+                    "name": "_id",
+                    "value": decode_cursor(query_query.cursor),
+                    "operator": Operators.GT,
+                }
+            )
+        fields = parse_fields(query_query.fields, QueryTypePartialResponse)
+        queries = await self.repo.query.get(filters, query_query.limit + 1, fields)
+        return paginate(queries, query_query.limit)
 
     async def delete_query(self, query_id: ObjectId, user_id: str) -> bool:
         query = await self.repo.query.get_by_id(query_id)
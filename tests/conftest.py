@@ -0,0 +1,71 @@
+import os
+import uuid
+
+# the settings are read when the modules are imported
+for key, value in {
+    "APP_HOST": "127.0.0.1",
+    "APP_PORT": "8000",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_NAME": "test",
+    "API_KEY": "test",
+    "PRIVATE_KEY": "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from beanie import init_beanie  # noqa: E402
+from models.connection import Connection  # noqa: E402
+from models.dashboard import Dashboard, PublishedDashboard  # noqa: E402
+from models.folder import Folder  # noqa: E402
+from models.query import Query  # noqa: E402
+
+DOCUMENT_MODELS = [Dashboard, PublishedDashboard, Folder, Connection, Query]
+# e.g. mongodb://localhost:27017/?replicaSet=rs0, the tests needing a server
+# are skipped without it
+MONGODB_TEST_URI = os.environ.get("MONGODB_TEST_URI")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def mock_database():
+    from mongomock_motor import AsyncMongoMockClient
+
+    database = AsyncMongoMockClient()["test"]
+    await init_beanie(database, document_models=DOCUMENT_MODELS)
+    yield database
+
+
+@pytest.fixture
+async def client(mock_database):
+    """
+    Client calling the app in process, on the mongomock database
+    """
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def database():
+    """
+    A fresh database on the MONGODB_TEST_URI server, dropped afterwards
+    """
+    if not MONGODB_TEST_URI:
+        pytest.skip("MONGODB_TEST_URI is not set")
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGODB_TEST_URI)
+    database = client[f"dashboards_test_{uuid.uuid4().hex[:8]}"]
+    await init_beanie(database, document_models=DOCUMENT_MODELS)
+    yield database
+    await client.drop_database(database.name)
+    client.close()
@@ -0,0 +1,87 @@
+import pytest
+from bson import ObjectId
+from configs.settings import settings
+from errors import ERR_DASHBOARD_NOT_FOUND, ERR_NOT_AUTHORIZED, ERR_QUERY_NOT_FOUND
+from models.connection import Connection, ConnectionType
+from models.dashboard import Dashboard
+from models.query import Query
+from repositories.registry import registry
+from schemas.batch import MAX_BATCH_SIZE, BatchGet
+from services.query import QueryService
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_dashboards_are_answered_one_by_one(client):
+    owned = await Dashboard(user_id="user", name="owned").insert()
+    other = await Dashboard(user_id="someone else", name="other").insert()
+    missing = ObjectId()
+
+    response = await client.post(
+        "/v1/dashboards:batchGet",
+        json={"user_id": "user", "ids": [str(owned.id), str(other.id), str(missing)]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert list(results) == [str(owned.id), str(other.id), str(missing)]
+    assert results[str(owned.id)]["item"]["name"] == "owned"
+    assert results[str(owned.id)]["error"] is None
+    assert results[str(other.id)]["item"] is None
+    assert results[str(other.id)]["error"]["code"] == ERR_NOT_AUTHORIZED
+    assert results[str(missing)]["error"]["code"] == ERR_DASHBOARD_NOT_FOUND
+
+
+async def test_dashboards_without_a_user_id_are_only_errors(client):
+    dashboards = [
+        await Dashboard(user_id="user", name=f"dashboard {index}").insert()
+        for index in range(2)
+    ]
+
+    response = await client.post(
+        "/v1/dashboards:batchGet",
+        json={"ids": [str(dashboard.id) for dashboard in dashboards]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"].values()
+    assert [result["item"] for result in results] == [None, None]
+    assert {result["error"]["code"] for result in results} == {ERR_NOT_AUTHORIZED}
+
+
+@pytest.mark.parametrize("count", [0, MAX_BATCH_SIZE + 1])
+async def test_batch_sizes_are_bounded(client, count):
+    response = await client.post(
+        "/v1/dashboards:batchGet",
+        json={"user_id": "user", "ids": [str(ObjectId()) for _ in range(count)]},
+    )
+    assert response.status_code == 400
+
+
+async def test_queries_are_answered_one_by_one(database):
+    service = QueryService(registry)
+    connection = await Connection(
+        user_id="user", name="connection", type=ConnectionType.REST
+    ).insert()
+    owned = await Query(
+        user_id="user", name="owned", connection_id=connection.id
+    ).insert()
+    other = await Query(
+        user_id="someone else", name="other", connection_id=connection.id
+    ).insert()
+    missing = ObjectId()
+    ids = [owned.id, other.id, missing]
+
+    batch = await service.get_queries_by_ids(BatchGet(user_id="user", ids=ids), None)
+
+    results = batch.results
+    assert results[str(owned.id)].item.name == "owned"
+    assert results[str(other.id)].error.code == ERR_NOT_AUTHORIZED
+    assert results[str(missing)].error.code == ERR_QUERY_NOT_FOUND
+
+    # the api key reads every query, missing ones are still missing
+    batch = await service.get_queries_by_ids(BatchGet(ids=ids), settings.API_KEY)
+
+    results = batch.results
+    assert results[str(other.id)].item.name == "other"
+    assert results[str(missing)].error.code == ERR_QUERY_NOT_FOUND
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from lib.cache import LRUCache
+from models.dashboard import Dashboard
+from repositories.cache import (
+    CacheInvalidator,
+    dashboards_cache,
+    evict_dashboard,
+    invalidator,
+)
+from repositories.dashboard import DashboardRepository
+from repositories.pipelines import collection_name
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def caches():
+    invalidator._set_enabled(True)
+    yield
+    invalidator._set_enabled(False)
+
+
+def test_set_drops_values_loaded_before_an_invalidation():
+    cache = LRUCache(10, 60)
+    generation = cache.generation
+    cache.invalidate("key")
+    cache.set("key", "stale", generation)
+    assert cache.get("key") is None
+    cache.set("key", "fresh", cache.generation)
+    assert cache.get("key") == "fresh"
+
+
+async def test_change_event_evicts_the_written_document(mock_database, caches):
+    dashboard = await Dashboard(name="dashboard", user_id="user").insert()
+    dashboards_cache.set(dashboard.id, dashboard)
+
+    invalidator.evict(
+        {
+            "operationType": "update",
+            "ns": {"db": mock_database.name, "coll": collection_name(Dashboard)},
+            "documentKey": {"_id": dashboard.id},
+        }
+    )
+
+    assert dashboards_cache.get(dashboard.id) is None
+
+
+async def test_read_racing_a_write_is_not_cached(mock_database, caches, monkeypatch):
+    dashboard = await Dashboard(name="dashboard", user_id="user").insert()
+    get = Dashboard.get
+
+    async def get_then_evict(document_id, **kwargs):
+        # the write lands while the read is in flight
+        document = await get(document_id, **kwargs)
+        evict_dashboard(document_id)
+        return document
+
+    monkeypatch.setattr(Dashboard, "get", get_then_evict)
+    await DashboardRepository().get_by_id(dashboard.id)
+
+    assert dashboards_cache.get(dashboard.id) is None
+
+
+async def wait_for(condition, timeout: float = 10) -> bool:
+    for _ in range(int(timeout / 0.1)):
+        if condition():
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def test_writes_from_other_workers_evict_the_cache(database):
+    watcher = CacheInvalidator()
+    watcher.start(database)
+    try:
+        if not await wait_for(lambda: dashboards_cache.enabled):
+            pytest.skip("change streams need a replica set")
+        dashboard = await Dashboard(name="dashboard", user_id="user").insert()
+        cached = await DashboardRepository().get_by_id(dashboard.id)
+        assert dashboards_cache.get(dashboard.id) == cached
+
+        # another worker writes straight to the collection
+        await database[collection_name(Dashboard)].update_one(
+            {"_id": dashboard.id}, {"$set": {"name": "renamed"}}
+        )
+
+        assert await wait_for(lambda: dashboards_cache.get(dashboard.id) is None)
+        found = await DashboardRepository().get_by_id(dashboard.id)
+        assert found.name == "renamed"
+    finally:
+        await watcher.stop()
@@ -0,0 +1,60 @@
+import logging
+import pytest
+from configs.database import MongoDB, plan_stages
+from configs.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+def test_plan_stages_reads_the_winning_plans():
+    plan = {
+        "stages": [
+            {
+                "$cursor": {
+                    "queryPlanner": {
+                        "winningPlan": {
+                            "stage": "LIMIT",
+                            "inputStage": {
+                                "stage": "SORT",
+                                "inputStage": {"stage": "IXSCAN"},
+                            },
+                        },
+                        "rejectedPlans": [{"stage": "COLLSCAN"}],
+                    }
+                }
+            }
+        ]
+    }
+    assert plan_stages(plan) == {"LIMIT", "SORT", "IXSCAN"}
+
+
+async def test_list_queries_are_served_by_indexes(database, caplog):
+    mongodb = MongoDB()
+    mongodb.database = database
+    with caplog.at_level(logging.WARNING, logger="dashboards"):
+        await mongodb.check_indexes()
+    assert not caplog.records
+
+
+class PingCounter:
+    def __init__(self):
+        self.pings = 0
+
+    async def command(self, name):
+        self.pings += 1
+
+
+@pytest.mark.parametrize("min_pool_size", [0, 3])
+async def test_warm_up_opens_the_minimum_pool_size(monkeypatch, min_pool_size):
+    monkeypatch.setattr(settings, "DB_MIN_POOL_SIZE", min_pool_size)
+    mongodb = MongoDB()
+    mongodb.database = PingCounter()
+    await mongodb.warm_up()
+    assert mongodb.database.pings == min_pool_size
+
+
+async def test_reads_go_to_the_primary_by_default(mock_database):
+    from models.dashboard import Dashboard
+    from repositories.session import Repository
+
+    assert Repository().stale_collection(Dashboard) is Dashboard.get_motor_collection()
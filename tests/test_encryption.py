@@ -0,0 +1,87 @@
+import pytest
+from cryptography.fernet import Fernet
+from lib.encryption import SEALED_PREFIX, open_credentials, seal_credentials
+from models.connection import Connection, ConnectionType
+from repositories.connection import ConnectionRepository
+from schemas.connection import ConnectionUpdate
+
+pytestmark = pytest.mark.anyio
+
+CREDENTIALS = {
+    "main_url": "https://api.example.com",
+    "headers": {"Authorization": "Bearer secret"},
+    "password": "secret",
+}
+
+
+def test_sealed_credentials_open_to_the_values_sent():
+    sealed = seal_credentials(CREDENTIALS)
+
+    assert sealed["main_url"] == CREDENTIALS["main_url"]
+    assert sealed["password"].startswith(SEALED_PREFIX)
+    assert sealed["headers"].startswith(SEALED_PREFIX)
+    assert open_credentials(sealed) == CREDENTIALS
+
+
+def test_sealed_values_are_not_encrypted_twice():
+    sealed = seal_credentials(CREDENTIALS)
+
+    assert seal_credentials(sealed) == sealed
+
+
+def test_values_sealed_with_an_unknown_key_are_left_sealed():
+    token = Fernet(Fernet.generate_key()).encrypt(b'"secret"').decode()
+    credentials = {"password": SEALED_PREFIX + token}
+
+    assert open_credentials(credentials) == credentials
+
+
+async def stored_credentials(connection_id) -> dict:
+    document = await Connection.get_motor_collection().find_one({"_id": connection_id})
+    return document["credentials"]
+
+
+async def test_created_credentials_are_stored_sealed(mock_database):
+    connection = Connection(
+        name="api",
+        user_id="user",
+        type=ConnectionType.REST,
+        credentials=dict(CREDENTIALS),
+    )
+
+    created = await ConnectionRepository().create(connection)
+
+    assert created.credentials == CREDENTIALS
+    stored = await stored_credentials(created.id)
+    assert stored["password"].startswith(SEALED_PREFIX)
+    assert open_credentials(stored) == CREDENTIALS
+
+
+async def test_updated_credentials_are_stored_sealed(mock_database):
+    connection = await ConnectionRepository().create(
+        Connection(name="api", user_id="user", type=ConnectionType.REST)
+    )
+
+    updated = await ConnectionRepository().update(
+        connection.id, ConnectionUpdate(user_id="user", credentials=dict(CREDENTIALS))
+    )
+
+    assert updated.credentials == CREDENTIALS
+    stored = await stored_credentials(connection.id)
+    assert stored["password"].startswith(SEALED_PREFIX)
+
+
+async def test_connections_are_read_with_their_credentials_open(database):
+    repository = ConnectionRepository()
+    connection = await repository.create(
+        Connection(
+            name="api",
+            user_id="user",
+            type=ConnectionType.REST,
+            credentials=dict(CREDENTIALS),
+        )
+    )
+
+    assert (await repository.get_by_id(connection.id)).credentials == CREDENTIALS
+    listed = await repository.get([], fields={"credentials"})
+    assert listed[0]["credentials"] == CREDENTIALS
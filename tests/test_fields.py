@@ -0,0 +1,75 @@
+import pytest
+from errors import CustomException
+from lib.fields import parse_fields
+from models.dashboard import Dashboard
+from schemas.dashboard import DashboardPartialResponse
+
+pytestmark = pytest.mark.anyio
+
+
+def test_fields_are_parsed_into_a_set():
+    assert parse_fields(" name, folder_id ,,", DashboardPartialResponse) == {
+        "name",
+        "folder_id",
+    }
+    assert parse_fields(None, DashboardPartialResponse) is None
+    assert parse_fields("", DashboardPartialResponse) is None
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(CustomException) as error:
+        parse_fields("name,password", DashboardPartialResponse)
+    assert error.value.status_code == 400
+    assert "password" in error.value.description
+
+
+async def test_a_dashboard_is_projected_to_the_requested_fields(client):
+    dashboard = await Dashboard(
+        user_id="user", name="sales", metadata={"widgets": [1, 2, 3]}
+    ).insert()
+
+    response = await client.get(
+        f"/v1/dashboards/{dashboard.id}",
+        params={"user_id": "user", "fields": "name"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["_id"] == str(dashboard.id)
+    assert body["name"] == "sales"
+    assert "metadata" not in body
+
+
+async def test_projected_dashboards_are_still_checked_for_their_owner(client):
+    dashboard = await Dashboard(user_id="user", name="sales").insert()
+
+    response = await client.get(
+        f"/v1/dashboards/{dashboard.id}",
+        params={"user_id": "someone else", "fields": "name"},
+    )
+
+    assert response.status_code == 403
+
+
+async def test_listed_dashboards_are_projected_to_the_requested_fields(client):
+    await Dashboard(user_id="user", name="sales", metadata={"widgets": [1]}).insert()
+
+    response = await client.get(
+        "/v1/dashboards/", params={"user_id": "user", "fields": "name"}
+    )
+
+    assert response.status_code == 200
+    [item] = response.json()["items"]
+    assert item["name"] == "sales"
+    assert "metadata" not in item
+
+
+async def test_unknown_fields_are_a_bad_request(client):
+    dashboard = await Dashboard(user_id="user", name="sales").insert()
+
+    response = await client.get(
+        f"/v1/dashboards/{dashboard.id}",
+        params={"user_id": "user", "fields": "name,secret"},
+    )
+
+    assert response.status_code == 400
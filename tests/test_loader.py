@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from lib.loader import DataLoader
+
+pytestmark = pytest.mark.anyio
+
+
+def recording_loader(fail: bool = False):
+    batches = []
+
+    async def batch_load(keys):
+        batches.append(list(keys))
+        await asyncio.sleep(0)
+        if fail:
+            raise ValueError("batch failed")
+        return [SimpleNamespace(id=key) for key in keys if key != "missing"]
+
+    return DataLoader(batch_load), batches
+
+
+async def test_loads_in_the_same_tick_are_coalesced():
+    loader, batches = recording_loader()
+
+    first, second, again, missing = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(1), loader.load("missing")
+    )
+
+    assert batches == [[1, 2, "missing"]]
+    assert (first.id, second.id) == (1, 2)
+    assert again is first
+    assert missing is None
+
+
+async def test_results_are_memoized():
+    loader, batches = recording_loader()
+
+    first = await loader.load(1)
+
+    assert await loader.load(1) is first
+    assert batches == [[1]]
+
+
+async def test_loads_cleared_before_the_dispatch_still_resolve():
+    loader, batches = recording_loader()
+
+    pending = loader.load(1)
+    loader.clear()
+    reloaded = loader.load(1)
+
+    first, second = await asyncio.wait_for(asyncio.gather(pending, reloaded), 1)
+    assert first.id == second.id == 1
+    assert batches == [[1]]
+
+
+async def test_cleared_results_are_loaded_again():
+    loader, batches = recording_loader()
+
+    await loader.load(1)
+    loader.clear()
+    await loader.load(1)
+
+    assert batches == [[1], [1]]
+
+
+async def test_failed_loads_are_not_memoized():
+    loader, batches = recording_loader(fail=True)
+
+    with pytest.raises(ValueError):
+        await loader.load(1)
+    with pytest.raises(ValueError):
+        await loader.load(1)
+    assert batches == [[1], [1]]
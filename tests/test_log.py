@@ -0,0 +1,22 @@
+import logging
+import queue
+import orjson
+from lib.log import JsonFormatter, JsonQueueHandler
+
+
+def test_tracebacks_are_written_as_their_own_field():
+    records = queue.SimpleQueue()
+    test_logger = logging.getLogger("dashboards.test")
+    test_logger.addHandler(JsonQueueHandler(records))
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            test_logger.exception("Failed %s", "loading")
+    finally:
+        test_logger.handlers = []
+
+    entry = orjson.loads(JsonFormatter().format(records.get_nowait()))
+
+    assert entry["message"] == "Failed loading"
+    assert "ValueError: boom" in entry["exception"]
@@ -0,0 +1,73 @@
+import pytest
+from cryptography.fernet import Fernet
+from lib.encryption import encrypt, open_credentials, seal_credentials
+from migrations.connection_credentials import encrypt_connection_credentials
+from migrations.openai_api_key_preview import backfill_openai_api_key_preview
+from models.connection import Connection, ConnectionType
+
+pytestmark = pytest.mark.anyio
+
+ROTATED_KEY = Fernet(Fernet.generate_key()).encrypt(b"sk-rotated").decode()
+
+
+async def insert_connections(api_keys: dict) -> dict:
+    connections = {}
+    for name, api_key in api_keys.items():
+        connection = Connection(
+            name=name,
+            user_id="user",
+            type=ConnectionType.REST,
+            credentials={"openai_api_key": api_key},
+        )
+        connections[name] = (await connection.insert()).id
+    return connections
+
+
+async def stored_credentials() -> dict:
+    collection = Connection.get_motor_collection()
+    return {
+        document["name"]: document["credentials"]
+        async for document in collection.find({})
+    }
+
+
+async def test_backfill_skips_keys_it_can_not_decrypt(mock_database):
+    await insert_connections({"rotated": ROTATED_KEY, "invalid": 1234})
+
+    await backfill_openai_api_key_preview()
+
+    for credentials in (await stored_credentials()).values():
+        assert "openai_api_key_preview" not in credentials
+
+
+async def test_backfill_stores_the_previews_it_can_compute(database):
+    await insert_connections(
+        {"valid": encrypt("sk-valid-1234"), "rotated": ROTATED_KEY, "invalid": 1234}
+    )
+
+    await backfill_openai_api_key_preview()
+
+    credentials = await stored_credentials()
+    assert credentials["valid"]["openai_api_key_preview"] == "*****1234"
+    assert "openai_api_key_preview" not in credentials["rotated"]
+    assert "openai_api_key_preview" not in credentials["invalid"]
+
+
+async def test_only_unsealed_credentials_are_encrypted(database):
+    collection = Connection.get_motor_collection()
+    sealed = seal_credentials({"password": "sealed"})
+    await collection.insert_many(
+        [
+            {"name": "plain", "credentials": {"password": "secret", "main_url": "u"}},
+            {"name": "sealed", "credentials": sealed},
+            {"name": "api key", "credentials": {"openai_api_key": encrypt("sk-1")}},
+        ]
+    )
+
+    await encrypt_connection_credentials()
+
+    credentials = await stored_credentials()
+    assert credentials["plain"]["main_url"] == "u"
+    assert open_credentials(credentials["plain"])["password"] == "secret"
+    assert credentials["sealed"] == sealed
+    assert "encrypted:" not in credentials["api key"]["openai_api_key"]
@@ -0,0 +1,103 @@
+import orjson
+import pytest
+from bson import Decimal128, ObjectId
+from lib import streaming
+from lib.streaming import NDJSON_MEDIA_TYPE, ndjson
+from main import app
+from routers.queries import get_query_service
+
+pytestmark = pytest.mark.anyio
+
+
+class Rows:
+    """
+    Source of rows that remembers whether it was closed
+    """
+
+    def __init__(self, rows):
+        self.source = iter(rows)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.source)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def written(rows) -> list:
+    return [chunk async for chunk in ndjson(rows)]
+
+
+async def test_each_row_is_a_line():
+    id = ObjectId()
+    rows = Rows([{"_id": id, "total": Decimal128("2.5")}, {"name": "b"}])
+
+    chunks = await written(rows)
+
+    assert b"".join(chunks).splitlines() == [
+        orjson.dumps({"_id": str(id), "total": 2.5}),
+        orjson.dumps({"name": "b"}),
+    ]
+    assert rows.closed
+
+
+async def test_rows_are_sent_in_chunks(monkeypatch):
+    monkeypatch.setattr(streaming, "CHUNK_SIZE", 32)
+    rows = [{"value": "x" * 10, "index": index} for index in range(10)]
+
+    chunks = await written(Rows(rows))
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    lines = b"".join(chunks).splitlines()
+    assert [orjson.loads(line) for line in lines] == rows
+
+
+async def test_empty_results_write_nothing():
+    rows = Rows([])
+    assert await written(rows) == []
+    assert rows.closed
+
+
+async def test_the_source_is_closed_when_the_client_goes_away():
+    rows = Rows([{"index": index} for index in range(3)])
+    stream = ndjson(rows)
+
+    await anext(stream)
+    await stream.aclose()
+
+    assert rows.closed
+
+
+class StreamingService:
+    async def stream_query(self, query_id, query, api_key):
+        return Rows([{"index": 0}, {"index": 1}])
+
+
+@pytest.fixture
+def streaming_service():
+    app.dependency_overrides[get_query_service] = StreamingService
+    yield
+    app.dependency_overrides.pop(get_query_service)
+
+
+async def test_queries_are_streamed_when_ndjson_is_accepted(client, streaming_service):
+    response = await client.post(
+        f"/v1/queries/{ObjectId()}/execute",
+        json={"user_id": "user"},
+        headers={"accept": NDJSON_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    assert [orjson.loads(line) for line in response.text.splitlines()] == [
+        {"index": 0},
+        {"index": 1},
+    ]
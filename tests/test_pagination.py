@@ -0,0 +1,68 @@
+import pytest
+from lib.pagination import encode_cursor
+from models.dashboard import Dashboard
+
+pytestmark = pytest.mark.anyio
+
+PATH = "/v1/dashboards/"
+
+
+async def stored_dashboards(count: int, user_id: str = "user") -> list:
+    dashboards = [
+        Dashboard(user_id=user_id, name=f"dashboard {index}") for index in range(count)
+    ]
+    await Dashboard.insert_many(dashboards)
+    return sorted(str(dashboard.id) for dashboard in await Dashboard.find().to_list())
+
+
+async def test_cursors_chain_through_every_page(client):
+    ids = await stored_dashboards(5)
+    await stored_dashboards(2, "someone else")
+
+    pages, cursor = [], None
+    while True:
+        params = {"user_id": "user", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(PATH, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([dashboard["_id"] for dashboard in page["items"]])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [id for page in pages for id in page] == ids[:5]
+
+
+async def test_a_last_page_filled_exactly_has_no_next_cursor(client):
+    await stored_dashboards(2)
+
+    page = (await client.get(PATH, params={"user_id": "user", "limit": 2})).json()
+
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is None
+
+
+async def test_pages_past_the_end_are_empty(client):
+    await stored_dashboards(3)
+    first = (await client.get(PATH, params={"user_id": "user", "limit": 3})).json()
+    last_id = first["items"][-1]["_id"]
+    response = await client.get(
+        PATH, params={"user_id": "user", "cursor": encode_cursor(last_id)}
+    )
+
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "abc", "!!!!"])
+async def test_malformed_cursors_are_rejected(client, cursor):
+    response = await client.get(PATH, params={"user_id": "user", "cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, 1001])
+async def test_limits_are_bounded(client, limit):
+    response = await client.get(PATH, params={"user_id": "user", "limit": limit})
+    assert response.status_code == 400
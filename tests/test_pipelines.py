@@ -0,0 +1,49 @@
+import pytest
+from models.connection import Connection, ConnectionType
+from models.dashboard import Dashboard
+from models.folder import Folder
+from models.query import Query
+from repositories.connection import ConnectionRepository
+from repositories.folder import FolderRepository
+from repositories.pipelines import collection_name
+from repositories.query import QueryRepository
+from conftest import DOCUMENT_MODELS
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_collection_name_is_where_documents_are_written(mock_database):
+    await Folder(name="folder", user_id="user").insert()
+    await Dashboard(name="dashboard", user_id="user").insert()
+    await Connection(name="connection", user_id="user", type=ConnectionType.REST).insert()
+    collections = await mock_database.list_collection_names()
+    for model in (Folder, Dashboard, Connection):
+        assert collection_name(model) in collections
+    for model in DOCUMENT_MODELS:
+        assert collection_name(model) == model.get_motor_collection().name
+
+
+async def test_lookups_join_the_documents(database):
+    folder = await Folder(name="folder", user_id="user").insert()
+    dashboard = await Dashboard(
+        name="dashboard", user_id="user", folder_id=folder.id
+    ).insert()
+    connection = await Connection(
+        name="connection", user_id="user", type=ConnectionType.REST
+    ).insert()
+    query = await Query(
+        name="query", user_id="user", connection_id=connection.id
+    ).insert()
+
+    found_folder = await FolderRepository().get_by_id(folder.id)
+    assert [summary.id for summary in found_folder.dashboards] == [dashboard.id]
+
+    found_connection = await ConnectionRepository().get_by_id(connection.id)
+    assert [found.id for found in found_connection.queries] == [query.id]
+
+    found_query = await QueryRepository().get_by_id(query.id)
+    assert found_query.connection.id == connection.id
+    assert found_query.connection_type == ConnectionType.REST
+
+    listed = await FolderRepository().get([])
+    assert [summary["_id"] for summary in listed[0]["dashboards"]] == [dashboard.id]
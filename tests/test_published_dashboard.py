@@ -0,0 +1,70 @@
+import pytest
+from beanie import PydanticObjectId as ObjectId
+from migrations.published_dashboard_version import backfill_published_dashboard_version
+from models.dashboard import Dashboard, PublishedDashboard
+from repositories.cache import published_dashboards_cache
+from repositories.dashboard import DashboardRepository
+
+pytestmark = pytest.mark.anyio
+
+PATHS = ["/v1/dashboards/{}/published", "/v1/dashboards/{}/published/bundle"]
+
+
+async def publish() -> ObjectId:
+    dashboard = Dashboard(id=ObjectId(), user_id="user", name="dashboard")
+    await DashboardRepository().publish(dashboard.id, dashboard)
+    return dashboard.id
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_published_dashboards_are_served_with_their_version(client, path):
+    dashboard_id = await publish()
+    published = await PublishedDashboard.find_one({"dashboard_id": dashboard_id})
+
+    response = await client.get(path.format(dashboard_id))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{published.version}"'
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_a_matching_etag_is_answered_without_a_body(client, path):
+    dashboard_id = await publish()
+    etag = (await client.get(path.format(dashboard_id))).headers["ETag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = await client.get(
+            path.format(dashboard_id), headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+
+async def test_republishing_changes_the_etag(client):
+    dashboard_id = await publish()
+    path = PATHS[0].format(dashboard_id)
+    etag = (await client.get(path)).headers["ETag"]
+
+    dashboard = Dashboard(id=dashboard_id, user_id="user", name="renamed")
+    await DashboardRepository().publish(dashboard_id, dashboard)
+    response = await client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "renamed"
+
+
+async def test_dashboards_published_without_a_version_get_a_stable_one(client):
+    dashboard_id = ObjectId()
+    dashboard = Dashboard(id=dashboard_id, user_id="user", name="dashboard")
+    await PublishedDashboard.get_motor_collection().insert_one(
+        {"dashboard_id": dashboard_id, "dashboard": dashboard.model_dump(), "queries": []}
+    )
+
+    await backfill_published_dashboard_version()
+
+    path = PATHS[0].format(dashboard_id)
+    first = (await client.get(path)).headers["ETag"]
+    published_dashboards_cache.invalidate(dashboard_id)
+    assert (await client.get(path)).headers["ETag"] == first
@@ -0,0 +1,34 @@
+import datetime
+import uuid
+from decimal import Decimal
+import orjson
+from bson import Decimal128, ObjectId
+from lib.responses import MongoJSONResponse
+
+
+class Interval:
+    def __str__(self):
+        return "1 day"
+
+
+def test_render_handles_driver_types():
+    object_id = ObjectId()
+    identifier = uuid.uuid4()
+    content = {
+        "id": object_id,
+        "uuid": identifier,
+        "price": Decimal("1.5"),
+        "total": Decimal128("2.5"),
+        "blob": b"\x00\x01",
+        "at": datetime.time(12, 30),
+        "interval": Interval(),
+    }
+    assert orjson.loads(MongoJSONResponse(content).body) == {
+        "id": str(object_id),
+        "uuid": str(identifier),
+        "price": 1.5,
+        "total": 2.5,
+        "blob": "AAE=",
+        "at": "12:30:00",
+        "interval": "1 day",
+    }
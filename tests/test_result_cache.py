@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from errors import CustomException
+from lib import result_cache
+from lib.result_cache import ResultCache
+from services.query import cache_seconds
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # the event loop reads time.monotonic too, only the cache's clock is replaced
+    monkeypatch.setattr(result_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def counting_load(value="rows"):
+    calls = []
+
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return f"{value} {len(calls)}"
+
+    return load, calls
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = ResultCache(max_bytes=1024)
+    load, calls = counting_load()
+
+    results = await asyncio.gather(*(cache.get("key", load, ttl=60) for _ in range(5)))
+
+    assert results == ["rows 1"] * 5
+    assert calls == ["rows"]
+    assert (cache.hits, cache.misses) == (0, 5)
+
+
+async def test_fresh_values_are_served_from_the_cache(clock):
+    cache = ResultCache(max_bytes=1024)
+    load, calls = counting_load()
+
+    await cache.get("key", load, ttl=60)
+    clock.now += 59
+
+    assert await cache.get("key", load, ttl=60) == "rows 1"
+    assert len(calls) == 1
+
+
+async def test_stale_values_are_served_while_they_refresh(clock):
+    cache = ResultCache(max_bytes=1024)
+    load, calls = counting_load()
+
+    await cache.get("key", load, ttl=60, stale_ttl=30)
+    clock.now += 70
+
+    assert await cache.get("key", load, ttl=60, stale_ttl=30) == "rows 1"
+    assert await cache.get("key", load, ttl=60, stale_ttl=30) == "rows 1"
+    await asyncio.sleep(0.05)
+    assert len(calls) == 2
+    assert await cache.get("key", load, ttl=60, stale_ttl=30) == "rows 2"
+
+
+async def test_expired_values_are_loaded_again(clock):
+    cache = ResultCache(max_bytes=1024)
+    load, calls = counting_load()
+
+    await cache.get("key", load, ttl=60, stale_ttl=30)
+    clock.now += 91
+
+    assert await cache.get("key", load, ttl=60, stale_ttl=30) == "rows 2"
+
+
+async def test_least_recently_used_values_are_evicted_by_size():
+    # each value is a 10 character JSON string
+    cache = ResultCache(max_bytes=25)
+    first, _ = counting_load("aaaaaa")
+    second, _ = counting_load("bbbbbb")
+    third, _ = counting_load("cccccc")
+
+    await cache.get("first", first, ttl=60)
+    await cache.get("second", second, ttl=60)
+    await cache.get("first", first, ttl=60)
+    await cache.get("third", third, ttl=60)
+
+    assert list(cache._entries) == ["first", "third"]
+    assert cache.bytes == 20
+
+
+async def test_values_larger_than_the_cache_are_not_stored():
+    cache = ResultCache(max_bytes=5)
+    load, calls = counting_load()
+
+    await cache.get("key", load, ttl=60)
+    await cache.get("key", load, ttl=60)
+
+    assert len(calls) == 2
+    assert cache.bytes == 0
+
+
+async def test_a_zero_ttl_skips_the_cache():
+    cache = ResultCache(max_bytes=1024)
+    load, calls = counting_load()
+
+    await cache.get("key", load, ttl=0)
+    await cache.get("key", load, ttl=0)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("value, seconds", [(60, 60), ("60", 60), ("1.5", 1.5), (0, 0)])
+def test_cache_durations_accept_numbers_and_numeric_strings(value, seconds):
+    assert cache_seconds({"cache_ttl": value}, "cache_ttl", 300) == seconds
+
+
+def test_cache_durations_default_when_missing():
+    assert cache_seconds({}, "cache_ttl", 300) == 300
+
+
+@pytest.mark.parametrize("value", ["soon", -1, None, True, [60], "nan", "inf"])
+def test_invalid_cache_durations_are_rejected(value):
+    with pytest.raises(CustomException) as error:
+        cache_seconds({"cache_ttl": value}, "cache_ttl", 300)
+    assert error.value.status_code == 400
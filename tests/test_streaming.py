@@ -0,0 +1,92 @@
+import pytest
+from configs.settings import settings
+from errors import CustomException
+from lib.streaming import arrow
+
+pytestmark = pytest.mark.anyio
+pa = pytest.importorskip("pyarrow")
+
+
+async def generate(rows, read=None):
+    for row in rows:
+        if read is not None:
+            read.append(row)
+        yield row
+
+
+async def read_stream(rows) -> "pa.Table":
+    data = b"".join([chunk async for chunk in await arrow(generate(rows))])
+    return pa.ipc.open_stream(data).read_all()
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTOR_BATCH_SIZE", 2)
+
+
+async def test_batches_are_written_as_they_are_read(small_batches):
+    read = []
+    stream = await arrow(generate([{"a": index} for index in range(6)], read))
+
+    assert len(read) == 2
+    chunks = [await anext(stream)]
+    assert len(read) == 2
+    chunks += [chunk async for chunk in stream]
+    assert len(read) == 6
+
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.to_batches()[0].num_rows == 2
+    assert table.column("a").to_pylist() == list(range(6))
+
+
+async def test_later_batches_are_cast_to_the_first_schema(small_batches):
+    rows = [{"total": 1.5, "name": "a"}, {"total": 2.0, "name": None}]
+    rows += [{"total": 3}, {"total": None, "name": "d"}]
+
+    table = await read_stream(rows)
+
+    assert table.schema.field("total").type == pa.float64()
+    assert table.to_pylist() == [
+        {"total": 1.5, "name": "a"},
+        {"total": 2.0, "name": None},
+        {"total": 3.0, "name": None},
+        {"total": None, "name": "d"},
+    ]
+
+
+async def test_keys_missing_from_some_rows_of_the_first_batch_are_kept(small_batches):
+    table = await read_stream([{"a": 1}, {"a": 2, "b": "x"}])
+    assert table.column_names == ["a", "b"]
+    assert table.column("b").to_pylist() == [None, "x"]
+
+
+async def test_rows_no_schema_fits_fail_before_streaming(small_batches):
+    with pytest.raises(CustomException) as error:
+        await arrow(generate([{"a": 1}, {"a": "one"}]))
+    assert error.value.status_code == 502
+
+
+@pytest.mark.parametrize(
+    "later",
+    [
+        [{"a": "three"}],
+        [{"a": 2.5}],
+        [{"a": 3, "b": True}],
+    ],
+)
+async def test_later_rows_that_do_not_fit_cut_the_stream_short(small_batches, later):
+    stream = await arrow(generate([{"a": 1}, {"a": 2}, *later]))
+    with pytest.raises(pa.ArrowException):
+        async for _ in stream:
+            pass
+
+
+async def test_empty_results_are_an_empty_stream():
+    table = await read_stream([])
+    assert table.num_rows == 0
+
+
+async def test_results_are_not_capped(monkeypatch, small_batches):
+    monkeypatch.setattr(settings, "EXECUTOR_MAX_ROWS", 3)
+    table = await read_stream([{"a": index} for index in range(10)])
+    assert table.num_rows == 10
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timezone
+import pytest
+from errors import CustomException
+from configs.settings import settings
+from executors.mongo import MongoExecutor
+from executors.transform import aggregate, downsampled, top
+from schemas.query import Transform
+
+
+def test_sum_of_no_values_is_null():
+    pytest.importorskip("numpy")
+    rows = [
+        {"region": "north", "total": 1},
+        {"region": "north", "total": None},
+        {"region": "south", "total": None},
+        {"region": "east", "total": 0},
+    ]
+    transform = Transform(
+        group_by=["region"],
+        aggregations=[
+            {"function": "sum", "column": "total"},
+            {"function": "avg", "column": "total"},
+        ],
+    )
+    assert aggregate(rows, transform) == [
+        {"region": "north", "sum_total": 1.0, "avg_total": 1.0},
+        {"region": "south", "sum_total": None, "avg_total": None},
+        {"region": "east", "sum_total": 0.0, "avg_total": 0.0},
+    ]
+
+
+@pytest.mark.anyio
+async def test_mongo_sums_of_no_values_are_null_as_in_memory():
+    pytest.importorskip("numpy")
+    from mongomock_motor import AsyncMongoMockClient
+
+    rows = [
+        {"region": "east", "total": 0},
+        {"region": "north", "total": 1},
+        {"region": "north", "total": None},
+        {"region": "south", "total": None},
+        {"region": "west"},
+    ]
+    transform = Transform(
+        group_by=["region"], aggregations=[{"function": "sum", "column": "total"}]
+    )
+    collection = AsyncMongoMockClient()["test"]["sales"]
+    await collection.insert_many([dict(row) for row in rows])
+
+    pipeline = MongoExecutor().pushdown({"collection": "sales"}, transform)["pipeline"]
+    pushed_down = await collection.aggregate(pipeline).to_list(None)
+
+    assert pushed_down == aggregate(rows, transform)
+    assert [row["sum_total"] for row in pushed_down] == [0, 1, None, None]
+
+
+async def generate(rows):
+    for row in rows:
+        yield row
+
+
+@pytest.mark.anyio
+async def test_downsampling_is_capped(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(settings, "EXECUTOR_MAX_DOWNSAMPLED_ROWS", 5)
+    transform = Transform(x="x", y="y", points=3)
+
+    rows = [{"x": index, "y": index} for index in range(5)]
+    assert len([row async for row in downsampled(generate(rows), transform)]) == 3
+
+    rows.append({"x": 5, "y": 5})
+    with pytest.raises(CustomException) as error:
+        [row async for row in downsampled(generate(rows), transform)]
+    assert error.value.status_code == 400
+
+
+def ranked(rows, column: str = "value", top_k: int = 10) -> list:
+    return top(rows, Transform(sort_by=column, top_k=top_k))
+
+
+def test_top_keeps_zeros_apart_from_missing_values():
+    rows = [{"value": 0}, {"value": None}, {}, {"value": -1}, {"value": float("nan")}]
+    assert ranked(rows)[:2] == [{"value": 0}, {"value": -1}]
+    assert ranked(rows, top_k=1) == [{"value": 0}]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["", "b", "a"],
+        [False, True],
+        [1, 2.5, 0],
+        [datetime(2024, 1, 1, 12), datetime(2024, 1, 3)],
+    ],
+)
+def test_top_sorts_values_of_one_kind(values):
+    rows = [{"value": value} for value in values]
+    assert [row["value"] for row in ranked(rows)] == sorted(values, reverse=True)
+
+
+def test_top_sorts_dates_with_datetimes():
+    values = [date(2024, 1, 2), datetime(2024, 1, 1, 12), datetime(2024, 1, 3)]
+    assert [row["value"] for row in ranked([{"value": value} for value in values])] == [
+        values[2],
+        values[0],
+        values[1],
+    ]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, "one"],
+        [{"nested": 1}],
+        [datetime(2024, 1, 1), datetime(2024, 1, 2, tzinfo=timezone.utc)],
+    ],
+)
+def test_top_refuses_values_it_can_not_order(values):
+    with pytest.raises(CustomException) as error:
+        ranked([{"value": value} for value in values])
+    assert error.value.status_code == 400
@@ -0,0 +1,107 @@
+import pytest
+from beanie import PydanticObjectId as ObjectId
+from errors import CustomException
+from models.dashboard import Dashboard
+from models.query import Query
+from repositories.dashboard import DashboardRepository
+from repositories.registry import registry
+from schemas.dashboard import DashboardUpdate
+from schemas.query import QueryUpdate
+from services.dashboard import DashboardService
+from services.query import QueryService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def services(mock_database):
+    return DashboardService(registry), QueryService(registry)
+
+
+async def stored_dashboard() -> Dashboard:
+    return await Dashboard(
+        user_id="owner", name="sales", metadata={"widgets": []}
+    ).insert()
+
+
+async def test_owners_update_their_dashboard(services):
+    dashboard_service, _ = services
+    dashboard = await stored_dashboard()
+
+    updated = await dashboard_service.update_dashboard(
+        dashboard.id, DashboardUpdate(user_id="owner", name="revenue")
+    )
+
+    assert updated.name == "revenue"
+    stored = await Dashboard.get(dashboard.id)
+    assert (stored.name, stored.metadata) == ("revenue", {"widgets": []})
+
+
+async def test_values_are_stored_as_they_were_sent(services):
+    dashboard_service, _ = services
+    dashboard = await stored_dashboard()
+
+    await dashboard_service.update_dashboard(
+        dashboard.id, DashboardUpdate(user_id="owner", name="$user_id")
+    )
+
+    assert (await Dashboard.get(dashboard.id)).name == "$user_id"
+
+
+async def test_other_users_can_not_update_a_dashboard(services):
+    dashboard_service, _ = services
+    dashboard = await stored_dashboard()
+
+    with pytest.raises(CustomException) as error:
+        await dashboard_service.update_dashboard(
+            dashboard.id, DashboardUpdate(user_id="someone else", name="revenue")
+        )
+
+    assert error.value.status_code == 403
+    assert (await Dashboard.get(dashboard.id)).name == "sales"
+
+
+async def test_updating_a_missing_dashboard_is_not_found(services):
+    dashboard_service, _ = services
+
+    with pytest.raises(CustomException) as error:
+        await dashboard_service.update_dashboard(
+            ObjectId(), DashboardUpdate(user_id="owner", name="revenue")
+        )
+
+    assert error.value.status_code == 404
+
+
+async def test_queries_follow_the_same_rules(services):
+    _, query_service = services
+    query = await Query(
+        user_id="owner", name="orders", connection_id=ObjectId(), metadata={"path": "/"}
+    ).insert()
+
+    updated = await query_service.update_query(
+        query.id, QueryUpdate(user_id="owner", metadata={"path": "/orders"})
+    )
+    assert updated.metadata == {"path": "/orders"}
+
+    with pytest.raises(CustomException) as error:
+        await query_service.update_query(
+            query.id, QueryUpdate(user_id="someone else", name="stolen")
+        )
+    assert error.value.status_code == 403
+
+    with pytest.raises(CustomException) as error:
+        await query_service.update_query(
+            ObjectId(), QueryUpdate(user_id="owner", name="orders")
+        )
+    assert error.value.status_code == 404
+    assert (await Query.get(query.id)).name == "orders"
+
+
+async def test_other_owners_get_their_document_back_unchanged(mock_database):
+    dashboard = await stored_dashboard()
+
+    returned = await DashboardRepository().update_owned(
+        Dashboard, dashboard.id, DashboardUpdate(user_id="someone else", name="x")
+    )
+
+    assert (returned.user_id, returned.name) == ("owner", "sales")